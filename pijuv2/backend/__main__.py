@@ -35,6 +35,7 @@ def main():
     logging.basicConfig(level=logging.DEBUG)
     app = create_app(args.database)
     app.worker.start()
+    app.broadcaster.start()
     mimetypes.init()
     # macOS: Need to disable AirPlay Receiver for listening on 0.0.0.0 to work
     # see https://developer.apple.com/forums/thread/682332
@@ -1,24 +1,29 @@
 from contextlib import nullcontext
-import json
 import os
 from pathlib import Path
-from queue import Queue
+from queue import Queue, SimpleQueue
+import threading
+import time
 
 from flask import Flask, has_app_context
-from flask_sock import ConnectionClosed
 
 from ..database.database import Database
 from ..player.fileplayer import FilePlayer
 from ..player.streamplayer import StreamPlayer
+from .broadcastthread import BroadcastThread
 from .config import Config
 from .downloadhistory import DownloadHistory
-from .nowplaying import get_current_status
+from .jsonprovider import ORJSONProvider
+from .nowplaying import get_current_status_message, invalidate_current_status
+from .pijurequest import PijuRequest
 from .routes import routes, sock
 from .workthread import WorkerThread
 
 
 def create_app(db_path: str, create_db=False) -> Flask:
     app = Flask(__name__)
+    app.request_class = PijuRequest
+    app.json = ORJSONProvider(app)
     Database.init_db(app, db_path, create_db)
     config_file = Path(os.environ.get('PIJU_CONFIG', Config.Defaults.FILEPATH))
     if not config_file.is_file():
@@ -33,8 +38,16 @@ def create_app(db_path: str, create_db=False) -> Flask:
     app.current_player = app.file_player
     app.api_version_string = '7.0'
     app.download_history = DownloadHistory()
-    app.websocket_clients = []
+    app.websocket_clients = set()
+    app.broadcast_queue = SimpleQueue()
+    app.broadcaster = BroadcastThread(app, app.broadcast_queue)
     app.update_now_playing = lambda: update_now_playing(app)
+    # library_version changes whenever the library (albums, tracks, genres, playlists, radio stations) changes.
+    # Starting from the current time ensures that versions from before a restart are not reused.
+    app.library_version = time.time_ns()
+    app.library_lock = threading.Lock()
+    app.library_changed = lambda: library_changed(app)
+    app.library_cache = {}  # see routes.library_cached
 
     def state_change_callback():
         app.update_now_playing()
@@ -47,12 +60,15 @@ def create_app(db_path: str, create_db=False) -> Flask:
     return app
 
 
+def library_changed(app):
+    # Called from both request handlers and the worker thread
+    with app.library_lock:
+        app.library_version += 1
+        app.library_cache.clear()
+
+
 def update_now_playing(app):
     context_manager = nullcontext if has_app_context() else app.app_context
     with context_manager():
-        data = json.dumps(get_current_status())
-        for ws in list(app.websocket_clients):
-            try:
-                ws.send(data)
-            except ConnectionClosed:
-                app.websocket_clients.remove(ws)
+        invalidate_current_status()
+        app.broadcast_queue.put(get_current_status_message())
@@ -0,0 +1,46 @@
+import logging
+from queue import Empty, SimpleQueue
+import threading
+
+from flask_sock import ConnectionClosed
+
+
+class BroadcastThread(threading.Thread):
+    """
+    Sends status updates to the connected websocket clients, so that the thread
+    that reported the change (eg a player's state change callback) isn't held up
+    by a slow client.
+    """
+    def __init__(self, app, broadcast_queue: SimpleQueue):
+        super().__init__(name='BroadcastThread', daemon=True)
+        self.app = app
+        self.broadcast_queue = broadcast_queue
+        self.last_sent = None
+
+    def run(self):
+        while True:
+            self.send_latest()
+
+    def send_latest(self):
+        data = self.broadcast_queue.get()
+        # Only the most recent status matters: skip any that have already been superseded
+        try:
+            while True:
+                data = self.broadcast_queue.get_nowait()
+        except Empty:
+            pass
+        # Nothing to do if nothing has changed since the last update.
+        # (A newly connected client is sent the current status when it connects.)
+        if data == self.last_sent:
+            return
+        self.last_sent = data
+        for ws in tuple(self.app.websocket_clients):
+            try:
+                ws.send(data)
+            except ConnectionClosed:
+                self.app.websocket_clients.discard(ws)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # eg OSError if the peer has reset the connection: one failed client mustn't
+                # end this thread, or no client would receive any further updates
+                logging.exception("Failed to send status update to websocket client: dropping client")
+                self.app.websocket_clients.discard(ws)
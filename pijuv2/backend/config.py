@@ -1,6 +1,8 @@
+from functools import lru_cache
 from pathlib import Path
 import socket
 import json5
+import orjson
 
 
 class ConfigException(Exception):
@@ -11,6 +13,7 @@ class ConfigException(Exception):
 
 class Config:
     class Defaults:
+        COMPRESSION_LEVEL = 1
         DOWNLOAD_DIR = Path('/tmp')
         FILEPATH = Path.home() / '.pijudrc'
         MUSIC_DIR = Path.home() / 'Music'
@@ -23,15 +26,33 @@ class Config:
             self.music_dir = Config.Defaults.MUSIC_DIR
             self.download_dir = Config.Defaults.DOWNLOAD_DIR
             self.server_name = Config.Defaults.SERVER_NAME
+            self.compression_level = Config.Defaults.COMPRESSION_LEVEL
 
         if not self.music_dir or not self.music_dir.is_dir():
             raise ConfigException(f"Music directory {self.music_dir} not found")
         if not self.download_dir.is_dir():
             raise ConfigException(f"Download directory {self.download_dir} not found")
+        if not (isinstance(self.compression_level, int) and 0 <= self.compression_level <= 9):
+            raise ConfigException(f"Compression level {self.compression_level} must be an integer from 0 to 9")
 
     def _init_from_file(self, filepath):
-        with filepath.open('r') as handle:
-            data = json5.load(handle)
-            self.music_dir = Path(data.get('music_dir', Config.Defaults.MUSIC_DIR))
-            self.download_dir = Path(data.get('download_dir', Config.Defaults.DOWNLOAD_DIR))
-            self.server_name = data.get('server_name', Config.Defaults.SERVER_NAME)
+        data = read_config_file(filepath, filepath.stat().st_mtime)
+        self.music_dir = Path(data.get('music_dir', Config.Defaults.MUSIC_DIR))
+        self.download_dir = Path(data.get('download_dir', Config.Defaults.DOWNLOAD_DIR))
+        self.server_name = data.get('server_name', Config.Defaults.SERVER_NAME)
+        self.compression_level = data.get('compression_level', Config.Defaults.COMPRESSION_LEVEL)
+
+
+@lru_cache(maxsize=4)
+def read_config_file(filepath: Path, _mtime: float) -> dict:
+    """
+    Parse the given config file. _mtime is only used as part of the cache key,
+    so that the file is parsed again if it has been modified.
+    The returned dict is shared between callers, so must not be modified.
+    """
+    text = filepath.read_bytes()
+    try:
+        # Most config files are plain JSON, which is far quicker to parse than JSON5
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json5.loads(text.decode('utf-8'))
@@ -12,6 +12,8 @@ from ..database.database import Database, NotFoundException
 from ..database.schema import Playlist, PlaylistEntry, RadioStation
 from ..scan.common import normalize_filepath
 
+TRUE_STRINGS = frozenset(('y', 'yes', 'true'))
+
 
 def build_playlist_from_api_data(db: Database) -> Tuple[Playlist, List[str]]:
     data = request.get_json()
@@ -33,20 +35,25 @@ def build_playlist_from_api_data(db: Database) -> Tuple[Playlist, List[str]]:
     if not tracks:
         raise BadRequest("No tracks found. Will not create an empty playlist.")
     playlist_entries = []
+    genreids = set()
     for index, track in enumerate(tracks):
         playlist_entries.append(PlaylistEntry(PlaylistIndex=index, TrackId=track.Id))
-    genres = set(track.Genre for track in tracks if track.Genre is not None)
-    genres = list(genres)
-    genres = [db.get_genre_by_id(genre) for genre in genres]
+        if track.Genre is not None:
+            genreids.add(track.Genre)
+    genres = db.get_genres_by_ids(genreids)
     return Playlist(Title=title, Entries=playlist_entries, Genres=genres), missing
 
 
 def build_playlist_from_api_data_files(db: Database, files: List[str]):
     tracks = []
     missing = []
-    for filepath in files:
-        fullpath = current_app.piju_config.music_dir / filepath
-        track = db.get_track_by_filepath(normalize_filepath(fullpath))
+    music_dir = current_app.piju_config.music_dir
+    # pathlib tidies repeated separators and '.' components, but (unlike os.path.normpath)
+    # leaves '..' alone, as collapsing it could change which file a path refers to
+    fullpaths = [normalize_filepath(music_dir / filepath) for filepath in files]
+    found = db.get_tracks_by_filepaths(fullpaths)
+    for filepath, fullpath in zip(files, fullpaths):
+        track = found.get(fullpath)
         if track:
             tracks.append(track)
         else:
@@ -60,7 +67,7 @@ def build_playlist_from_api_data_trackids(db: Database, trackids: List[int]):
     if None in trackids:
         raise BadRequest("Invalid track reference")
     try:
-        tracks = [db.get_track_by_id(trackid) for trackid in trackids]
+        tracks = db.get_tracks_by_ids(trackids)
     except NotFoundException as exc:
         raise NotFound("Unknown track id") from exc
     return tracks, missing
@@ -87,12 +94,15 @@ def build_radio_station_from_api_data() -> RadioStation:
 
 
 def extract_id(uri_or_id):
-    if uri_or_id and isinstance(uri_or_id, str) and '/' in uri_or_id:
-        # this is a uri, map it to a string representation of an id, then fall-through
-        uri_or_id = uri_or_id.rsplit('/', 1)[1]
-    if uri_or_id and isinstance(uri_or_id, str) and uri_or_id.isdigit():
-        uri_or_id = int(uri_or_id)
-    return uri_or_id if isinstance(uri_or_id, int) else None
+    if isinstance(uri_or_id, int):
+        return uri_or_id
+    if isinstance(uri_or_id, str):
+        # For a uri, the id is the last path component; a bare id has no '/', so is unchanged
+        id_str = uri_or_id.rpartition('/')[2]
+        # isdigit() alone also accepts characters such as superscripts, which int() rejects
+        if id_str.isascii() and id_str.isdigit():
+            return int(id_str)
+    return None
 
 
 def extract_ids(uris_or_ids):
@@ -100,6 +110,4 @@ def extract_ids(uris_or_ids):
 
 
 def parse_bool(bool_str: str):
-    if bool_str.lower() in ('y', 'yes', 'true'):
-        return True
-    return False
+    return bool_str.lower() in TRUE_STRINGS
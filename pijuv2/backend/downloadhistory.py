@@ -1,15 +1,26 @@
+from collections import OrderedDict
+from typing import List
+
+
 class DownloadHistory:
     def __init__(self, max_length=10):
-        self.entries = []  # The actual downloaded URLs
+        self._urls = OrderedDict()  # The actual downloaded URLs (as keys), oldest first
         self.files = {}  # URL -> List[DownloadInfo]
         self.max_length = max_length
 
+    @property
+    def entries(self) -> List[str]:
+        """
+        The downloaded URLs, most recent first
+        """
+        return list(reversed(self._urls))
+
     def add(self, url):
-        if url in self.entries:
-            index = self.entries.index(url)
-            self.entries.pop(index)
-        self.entries.insert(0, url)
-        self.entries = self.entries[:self.max_length]
+        self._urls[url] = None
+        self._urls.move_to_end(url)
+        if len(self._urls) > self.max_length:
+            oldest_url, _ = self._urls.popitem(last=False)
+            self.files.pop(oldest_url, None)
 
     def set_info(self, url, files):
         self.files[url] = files
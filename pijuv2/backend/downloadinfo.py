@@ -1,10 +1,8 @@
 from collections import namedtuple
-from pathlib import Path
-from typing import Union
 
 
 DownloadInfo = namedtuple('DownloadInfo', 'filepath, artist, title, artwork, url, fake_trackid')
-# filepath: Path
+# filepath: str
 # artist: str
 # title: str
 
@@ -15,9 +13,7 @@ class DownloadInfoDatabase:
         self._filepath_to_id = {}
         self._next_id_to_allocate = -1
 
-    def get_id_for_filepath(self, filepath: Union[str, Path]) -> int:
-        if isinstance(filepath, Path):
-            filepath = str(filepath)
+    def get_id_for_filepath(self, filepath: str) -> int:
         track_id = self._filepath_to_id.get(filepath)
         if track_id is None:
             track_id = self._next_id_to_allocate
@@ -1,38 +1,131 @@
-from flask import current_app
+import time
+
+from flask import current_app, has_request_context
+import orjson
 
 from ..database.database import DatabaseAccess
 from ..player.playerinterface import CurrentStatusStrings
 from .serialize import json_track_or_file
 
+LIBRARY_COUNTS_TTL = 2.0  # seconds
+STATUS_TTL = 1.0  # seconds
+
+# (library version, time.monotonic() when fetched, (nr albums, nr artworks, nr tracks))
+_library_counts = (None, 0.0, None)
+
+# (status key, time.monotonic() when built, status)
+_current_status = (None, 0.0, None)
+
+# (the status that was serialized, its serialization)
+_current_status_message = (None, None)
+
+
+def get_library_counts():
+    """
+    Return the number of albums, artworks and tracks in the library.
+    These are needed for every status update, but change rarely, so the
+    counts are reused until the library changes, or for LIBRARY_COUNTS_TTL
+    seconds (so that progress during a long scan is still reported).
+    The database is only accessed when the counts need refreshing.
+    """
+    global _library_counts  # pylint: disable=global-statement
+    version, fetched, counts = _library_counts
+    now = time.monotonic()
+    if version != current_app.library_version or now - fetched > LIBRARY_COUNTS_TTL:
+        with DatabaseAccess() as db:
+            counts = db.get_nr_albums_artworks_tracks()
+        _library_counts = (current_app.library_version, now, counts)
+    return counts
+
+
+def invalidate_current_status():
+    """
+    Discard the memoized status: call whenever the player or worker state changes
+    """
+    global _current_status  # pylint: disable=global-statement
+    _current_status = (None, 0.0, None)
+
+
+def current_status_key():
+    c_p = current_app.current_player
+    # Links are relative in response to a request, but absolute otherwise (eg in websocket updates)
+    return (has_request_context(),
+            id(c_p),
+            c_p.current_status,
+            c_p.current_volume,
+            c_p.current_track_index,
+            c_p.number_of_tracks,
+            c_p.current_tracklist_identifier if (c_p == current_app.file_player) else None,
+            current_app.worker.current_status,
+            current_app.library_version)
+
 
 def get_current_status():
-    with DatabaseAccess() as db:
-        c_p = current_app.current_player
-        rtn = {
-            'WorkerStatus': current_app.worker.current_status,
-            'PlayerStatus': c_p.current_status,
-            'PlayerVolume': c_p.current_volume,
-            'NumberAlbums': db.get_nr_albums(),
-            'NumberArtworks': db.get_nr_artworks(),
-            'NumberTracks': db.get_nr_tracks(),
-            'CurrentTrackIndex': None if (c_p.current_track_index is None) else (c_p.current_track_index + 1),
-            'MaximumTrackIndex': c_p.number_of_tracks,
-            'ApiVersion': current_app.api_version_string,
-        }
-        if c_p == current_app.file_player:
-            rtn['CurrentTracklistUri'] = c_p.current_tracklist_identifier
-            if c_p.current_track:
+    """
+    Return the current status of the server.
+    Clients poll this, and it's sent to every websocket client on every change,
+    so the status is reused for up to STATUS_TTL seconds while nothing that it
+    depends on has changed.
+    """
+    return dict(_get_memoized_status())
+
+
+def get_current_status_message() -> str:
+    """
+    Return the current status serialized for sending to websocket clients.
+    The serialization is reused for as long as the status itself is.
+    Decoded so that clients still receive a text, rather than binary, message.
+    """
+    global _current_status_message  # pylint: disable=global-statement
+    status = _get_memoized_status()
+    serialized_status, message = _current_status_message
+    if serialized_status is not status:
+        message = orjson.dumps(status).decode('utf-8')
+        _current_status_message = (status, message)
+    return message
+
+
+def _get_memoized_status():
+    global _current_status  # pylint: disable=global-statement
+    key = current_status_key()
+    cached_key, built, status = _current_status
+    now = time.monotonic()
+    if key != cached_key or now - built > STATUS_TTL:
+        status = build_current_status()
+        _current_status = (key, now, status)
+    return status
+
+
+def build_current_status():
+    c_p = current_app.current_player
+    nr_albums, nr_artworks, nr_tracks = get_library_counts()
+    rtn = {
+        'WorkerStatus': current_app.worker.current_status,
+        'PlayerStatus': c_p.current_status,
+        'PlayerVolume': c_p.current_volume,
+        'NumberAlbums': nr_albums,
+        'NumberArtworks': nr_artworks,
+        'NumberTracks': nr_tracks,
+        'CurrentTrackIndex': None if (c_p.current_track_index is None) else (c_p.current_track_index + 1),
+        'MaximumTrackIndex': c_p.number_of_tracks,
+        'ApiVersion': current_app.api_version_string,
+    }
+    if c_p == current_app.file_player:
+        rtn['CurrentTracklistUri'] = c_p.current_tracklist_identifier
+        if c_p.current_track:
+            # The only part of the status that needs a database session
+            with DatabaseAccess() as db:
                 rtn['CurrentTrack'] = json_track_or_file(db, c_p.current_track)
-                rtn['CurrentArtwork'] = rtn['CurrentTrack']['artwork']
-            else:
-                rtn['CurrentTrack'] = {}
-                rtn['CurrentArtwork'] = None
-        elif c_p == current_app.stream_player:
-            rtn['CurrentStream'] = c_p.currently_playing_name
-            rtn['CurrentArtwork'] = c_p.currently_playing_artwork
-            if c_p.current_status == CurrentStatusStrings.PLAYING and c_p.now_playing_artist and c_p.now_playing_track:
-                rtn['CurrentTrack'] = {
-                    'artist': c_p.now_playing_artist,
-                    'title': c_p.now_playing_track
-                }
+            rtn['CurrentArtwork'] = rtn['CurrentTrack']['artwork']
+        else:
+            rtn['CurrentTrack'] = {}
+            rtn['CurrentArtwork'] = None
+    elif c_p == current_app.stream_player:
+        rtn['CurrentStream'] = c_p.currently_playing_name
+        rtn['CurrentArtwork'] = c_p.currently_playing_artwork
+        if c_p.current_status == CurrentStatusStrings.PLAYING and c_p.now_playing_artist and c_p.now_playing_track:
+            rtn['CurrentTrack'] = {
+                'artist': c_p.now_playing_artist,
+                'title': c_p.now_playing_track
+            }
     return rtn
@@ -0,0 +1,16 @@
+"""
+A Flask request class that parses the request headers the server cares about
+at most once per request, however many times they are consulted
+"""
+
+from functools import cached_property
+
+from flask import Request
+
+
+class PijuRequest(Request):
+    @cached_property
+    def accepts_gzip(self) -> bool:
+        # accept_encodings is Werkzeug's own (cached) parse of the header, which
+        # also honours wildcards and explicit refusals such as 'gzip;q=0'
+        return self.accept_encodings['gzip'] > 0
@@ -43,7 +43,7 @@ def queue_downloaded_files(app, url, download_info: Iterable[DownloadInfo]):
     select_player(app, app.file_player)
     app.download_history.set_info(url, download_info)
     for one_download in download_info:
-        app.current_player.add_to_queue(str(one_download.filepath),
+        app.current_player.add_to_queue(one_download.filepath,
                                         one_download.fake_trackid,
                                         one_download.artist, one_download.title,
                                         one_download.artwork)
@@ -86,11 +86,7 @@ def update_player_play_album(db: Database, albumid: int, trackid: int, disk_nr:
     except NotFoundException as exc:
         raise NotFound("Unknown album id") from exc
 
-    def track_sort_order(track):
-        return (track.VolumeNumber if track.VolumeNumber else 0,
-                track.TrackNumber if track.TrackNumber else 0)
-
-    tracks = list(sorted(album.Tracks, key=track_sort_order))
+    tracks = list(album.Tracks)  # already sorted by disk and track number
     if disk_nr is not None:
         tracks = [track for track in tracks if track.VolumeNumber == disk_nr]
     update_player_play_track_list(tracks, url_for(RouteConstants.GET_ALBUM, albumid=albumid), trackid)
@@ -113,7 +109,7 @@ def update_player_play_from_local(db: Database,
     elif queue_pos is not None:
         update_player_play_from_queue(queue_pos, trackid)
 
-    elif trackid:
+    elif trackid is not None:
         update_player_play_track(db, trackid)
 
     else:
@@ -5,6 +5,8 @@
 # prevents requests to http://localhost:5000/ from working.
 
 import re
+from functools import lru_cache
+from typing import Iterable, List
 from urllib.parse import quote
 
 from flask import current_app, has_request_context
@@ -21,10 +23,53 @@ class RouteConstants:
     GET_TRACK = '/tracks/<trackid>'
 
 
+@lru_cache(maxsize=None)
+def _route_template(route) -> str:
+    """
+    Convert a route (eg '/artists/<path:artist>') to a str.format template
+    (eg '/artists/{artist}'). There are only a handful of routes, so this
+    only ever runs once per route.
+    """
+    return re.sub(r'<(?:[^>:]*:)?([^>]*)>', r'{\1}', route)
+
+
+@lru_cache(maxsize=8192)
+def _expand_route(route, kwargs) -> str:
+    """
+    Substitute the given (kwarg, value) pairs into route, and quote the result.
+    Routes are stable, so the result depends only on the arguments, and
+    can be cached: serializing a large list builds the same URLs repeatedly.
+    """
+    return quote(_route_template(route).format(**dict(kwargs)))
+
+
+@lru_cache(maxsize=None)
+def _id_route_prefix(route) -> str:
+    """
+    The part of a route with a single, final, parameter (eg '/albums/<albumid>')
+    that precedes the parameter (eg '/albums/').
+    """
+    prefix, _, param = route.partition('<')
+    assert param.endswith('>') and '<' not in param, f"{route} does not end with its only parameter"
+    return prefix
+
+
 def url_for(route, **kwargs) -> str:
-    for kwarg, val in kwargs.items():
-        if not isinstance(val, str):
-            val = str(val)
-        route = re.sub(r'<([^>:]*:)?' + kwarg + '>', val, route)
+    if len(kwargs) == 1 and isinstance(value := next(iter(kwargs.values())), int):
+        # The common case: a single integer id, which needs neither formatting nor quoting
+        path = _id_route_prefix(route) + str(value)
+    else:
+        path = _expand_route(route, tuple(kwargs.items()))
+    return path if has_request_context() else current_app.server_address + path
+
 
-    return quote(route) if has_request_context() else current_app.server_address + quote(route)
+def url_for_ids(route, ids: Iterable[int]) -> List[str]:
+    """
+    Equivalent to [url_for(route, id=id) for id in ids], for a route whose only
+    parameter is an id. The route prefix and request context are looked up once
+    for the whole list, and integer ids never need quoting.
+    """
+    prefix = _id_route_prefix(route)
+    if not has_request_context():
+        prefix = current_app.server_address + prefix
+    return [f'{prefix}{id_}' for id_ in ids]
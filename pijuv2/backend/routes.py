@@ -1,27 +1,30 @@
-from collections import defaultdict
+import functools
 import gzip
+import hashlib
 from http import HTTPStatus
-import json
-import mimetypes
+import itertools
+from operator import attrgetter
 import os.path
-from pathlib import Path
 import time
-from typing import List
+from typing import Iterable, Iterator, List, Optional
+import zlib
 
-from flask import Blueprint, current_app, jsonify, make_response, request, Response
+from flask import Blueprint, current_app, make_response, request, Response, send_file, stream_with_context
 from flask_sock import Sock
+import orjson
 from werkzeug.exceptions import BadRequest, BadRequestKeyError, Conflict, InternalServerError, NotFound
+from werkzeug.http import unquote_etag
 
 from ..database.database import DatabaseAccess, NotFoundException
 from ..database.schema import Playlist
 from .downloadinfo import DownloadInfoDatabaseSingleton
 from .deserialize import build_playlist_from_api_data, build_radio_station_from_api_data, extract_id, parse_bool
-from .nowplaying import get_current_status
+from .nowplaying import get_current_status, get_current_status_message
 from .playerctrl import add_track_to_queue, queue_downloaded_files, select_player
 from .playerctrl import update_player_play_from_local, update_player_play_from_radio, update_player_play_from_youtube
 from .playerctrl import update_player_streaming_prevnext
 from .routeconsts import RouteConstants, url_for
-from .serialize import json_genre, json_playlist, json_track_or_file
+from .serialize import json_genre, json_playlist, json_queue
 from .serialize import InformationLevel
 from .serialize import json_album, json_radio_station, json_track
 from .workrequests import WorkRequests
@@ -36,29 +39,158 @@ ERR_MSG_UNKNOWN_PLAYLIST_ID = 'Unknown playlist id'
 ERR_MSG_UNKNOWN_RADIO_ID = 'Unknown radio station id'
 ERR_MSG_NO_QUEUE_WHEN_STREAMING = "Queue operations not permitted when playing streaming content"
 
+GZIP_MIN_SIZE = 1024  # bytes: smaller responses aren't worth the cost of compressing
+
+LIBRARY_CACHE_SIZE = 256  # responses
+
+# Curly quotes to their plain equivalents
+NORMALIZE_PUNCTUATION_TABLE = str.maketrans({0x2018: "'", 0x2019: "'", 0x201c: '"', 0x201d: '"'})
+
+# Mime types for the artwork file types we expect to find
+ARTWORK_SUFFIX_MIMETYPES = {
+    '.gif': 'image/gif',
+    '.jpeg': 'image/jpeg',
+    '.jpg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+}
+
+# Mime types for embedded artwork, keyed on the signature that the image starts with
+ARTWORK_BLOB_MAGIC_NUMBERS = {
+    b'\xff\xd8\xff': 'image/jpeg',
+    b'\x89PNG\r\n\x1a\n': 'image/png',
+    b'GIF8': 'image/gif',
+}
+
+
+def client_accepts_gzip():
+    return request.accepts_gzip
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(current_app.piju_config.compression_level, zlib.DEFLATED, 31)  # 31: gzip format
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
 
 def gzippable_jsonify(content):
-    if 'gzip' in request.headers.get('Accept-Encoding', '').lower():
-        content = json.dumps(content, separators=(',', ':'))  # avoid whitespace in response
-        content = gzip.compress(content.encode('utf-8'), 5)
-        response = make_response(content)
-        response.headers['Content-Length'] = len(content)
-        response.headers['Content-Encoding'] = 'gzip'
+    content = orjson.dumps(content)  # already compact, and already bytes
+    headers = {'Vary': 'Accept-Encoding'}  # so caches don't serve a gzipped response to other clients
+    # Clients poll some routes (eg the status): a hash of the body lets them be told
+    # that nothing has changed, instead of being sent it all again.
+    # The tag is weak as it identifies the content, whichever encoding is used to send it.
+    etag = hashlib.blake2s(content, digest_size=8).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        response.set_etag(etag, weak=True)
         return response
-    return jsonify(content)
+    if len(content) >= GZIP_MIN_SIZE and client_accepts_gzip():
+        # mtime=0 lets gzip hand the whole job to a single zlib.compress call,
+        # rather than building the header and CRC trailer separately
+        content = gzip.compress(content, current_app.piju_config.compression_level, mtime=0)
+        headers['Content-Encoding'] = 'gzip'
+    # Response sets the Content-Length itself, from the body
+    response = Response(content, headers=headers, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def gzippable_stream_jsonify(items: Iterable):
+    """
+    The equivalent of gzippable_jsonify(list(items)), but the response is
+    serialized (and compressed) one item at a time as it is sent, so neither
+    the full list nor its serialization needs to be held in memory.
+    Any database access needed to produce the items must be done within the
+    generator, as the route will have returned before the response is sent.
+    """
+    def generate_json():
+        separator = b'['
+        for item in items:
+            yield separator
+            yield orjson.dumps(item)
+            separator = b','
+        yield b'[]' if separator == b'[' else b']'
+
+    headers = {'Vary': 'Accept-Encoding'}
+    body = generate_json()
+    if client_accepts_gzip():
+        body = gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(body), headers=headers, mimetype='application/json')
+
+
+def artwork_blob_mimetype(blob: bytes) -> Optional[str]:
+    return next((mime for magic, mime in ARTWORK_BLOB_MAGIC_NUMBERS.items() if blob.startswith(magic)), None)
+
+
+def library_etag(route_function):
+    """
+    Decorator for GET routes whose response depends only on the library contents,
+    and not on the player: tags the response with the library version, and
+    responds with 304 Not Modified if the client already has that version.
+    """
+    @functools.wraps(route_function)
+    def wrapper(*args, **kwargs):
+        etag = str(current_app.library_version)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=HTTPStatus.NOT_MODIFIED)
+        else:
+            response = route_function(*args, **kwargs)
+        response.set_etag(etag, weak=True)
+        # Clients may keep the response, but must revalidate before using it
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+def library_cached(*arg_names: str):
+    """
+    Decorator for GET routes whose response depends only on the library contents,
+    the request path and the given query arguments: keeps the response body until
+    the library next changes, so that repeated requests don't query and serialize
+    the library again.
+    Any other query arguments (eg cache busters) are ignored, so that they
+    don't each fill the cache with another copy of the same body.
+    Not for streamed responses (gzippable_stream_jsonify): caching them would buffer the whole body.
+    """
+    def decorator(route_function):
+        @functools.wraps(route_function)
+        def wrapper(*args, **kwargs):
+            # The encoding is part of the key as the body may be gzipped
+            key = (current_app.library_version,
+                   request.path,
+                   tuple(request.args.get(arg_name) for arg_name in arg_names),
+                   client_accepts_gzip())
+            cached = current_app.library_cache.get(key)
+            if cached is None:
+                response = route_function(*args, **kwargs)
+                if response.status_code != HTTPStatus.OK:
+                    return response
+                cached = (response.get_data(), response.headers.copy())
+                if len(current_app.library_cache) >= LIBRARY_CACHE_SIZE:
+                    current_app.library_cache.clear()
+                current_app.library_cache[key] = cached
+            body, headers = cached
+            # The cached body's tag (if it has one) is still valid, so a client that has the body needn't be resent it
+            etag, _ = unquote_etag(headers.get('ETag'))
+            if etag is not None and request.if_none_match.contains_weak(etag):
+                return Response(status=HTTPStatus.NOT_MODIFIED,
+                                headers=[(name, value) for name, value in headers if name in ('ETag', 'Vary')])
+            return Response(body, headers=headers)
+        return wrapper
+    return decorator
 
 
 def normalize_punctuation(search_string):
-    return search_string.replace(chr(0x2018), "'")\
-                        .replace(chr(0x2019), "'")\
-                        .replace(chr(0x201c), '"')\
-                        .replace(chr(0x201d), '"')
+    return search_string.translate(NORMALIZE_PUNCTUATION_TABLE)
 
 
-def response_for_import_playlist(playlist: Playlist, missing_tracks: List[str]):
+def response_for_import_playlist(playlist: Playlist, nr_tracks: int, missing_tracks: List[str]):
     response = {
         'playlistid': playlist.Id,
-        'nrtracks': len(playlist.Entries),
+        'nrtracks': nr_tracks,
         'missing': missing_tracks,
     }
     return gzippable_jsonify(response)
@@ -73,24 +205,29 @@ def add_security_headers(resp):
 @routes.get("/")
 def current_status():
     rtn = get_current_status()
-    return gzippable_jsonify(rtn)
+    response = gzippable_jsonify(rtn)
+    # Clients may keep the status, but must revalidate before using it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @routes.get("/albums/")
+@library_etag
 def get_all_albums():
-    with DatabaseAccess() as db:
-        rtn = []
-        for album in db.get_all_albums():
-            rtn.append(json_album(album, include_tracks=InformationLevel.NoInfo))
-        return gzippable_jsonify(rtn)
+    def generate():
+        with DatabaseAccess() as db:
+            for album in db.get_all_albums():
+                yield json_album(album, include_tracks=InformationLevel.NoInfo)
+    return gzippable_stream_jsonify(generate())
 
 
 @routes.get(RouteConstants.GET_ALBUM)
+@library_cached('tracks')
 def get_album(albumid):
     track_info = InformationLevel.from_string(request.args.get('tracks', ''), InformationLevel.Links)
     with DatabaseAccess() as db:
         try:
-            album = db.get_album_by_id(albumid)
+            album = db.get_album_by_id(albumid, track_ids_only=(track_info == InformationLevel.Links))
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_ALBUM_ID) from exc
         return gzippable_jsonify(json_album(album, include_tracks=track_info))
@@ -108,7 +245,8 @@ def edit_album(albumid):
             raise NotFound(ERR_MSG_UNKNOWN_ALBUM_ID) from exc
         if year := int(data.get('releasedate', 0)):
             album.ReleaseYear = year
-        return ('', HTTPStatus.NO_CONTENT)
+    current_app.library_changed()
+    return ('', HTTPStatus.NO_CONTENT)
 
 
 # Pretend artist is a full-path, so we correctly handle bands like 'AC/DC'
@@ -121,16 +259,14 @@ def get_artist(artist):
             albums = db.get_compilations()
             if not albums:
                 raise NotFound("No compilation albums found")
-            result = defaultdict(list)
-            for album in albums:
-                result[artist].append(json_album(album, include_tracks=track_info))
+            result = {artist: [json_album(album, include_tracks=track_info) for album in albums]}
         else:
             albums = db.get_artist(artist, substring=not exact)
             if not albums:
                 raise NotFound("No matching artist found")
-            result = defaultdict(list)
-            for album in albums:
-                result[album.Artist].append(json_album(album, include_tracks=track_info))
+            # get_artist orders by artist, so each artist's albums are consecutive
+            result = {album_artist: [json_album(album, include_tracks=track_info) for album in artist_albums]
+                      for album_artist, artist_albums in itertools.groupby(albums, key=attrgetter('Artist'))}
     return gzippable_jsonify(result)
 
 
@@ -143,24 +279,25 @@ def get_artwork(artworkid):
             raise NotFound(ERR_MSG_UNKNOWN_TRACK_ID) from exc
 
         if artwork.Path:
-            path = Path(artwork.Path)
-            mime = mimetypes.types_map.get(path.suffix)
-            if mime is None:
-                mime = mimetypes.common_types.get(path.suffix)
-            with open(artwork.Path, 'rb') as handle:
-                data = handle.read()
-
-            return Response(data, headers={'Cache-Control': 'max-age=300'}, mimetype=mime)
-
-        elif artwork.Blob:
-            if artwork.Blob[:3] == b'\xff\xd8\xff':
-                mime = mimetypes.types_map['.jpg']
-            elif artwork.Blob[:8] == b'\x89\x50\x4e\x47\x0d\x0a\x1a\x0a':
-                mime = mimetypes.types_map['.png']
+            # send_file guesses the mime type itself for anything not in the table
+            mime = ARTWORK_SUFFIX_MIMETYPES.get(os.path.splitext(artwork.Path)[1].lower())
+            # send_file streams the file (using sendfile(2) where the server supports it),
+            # rather than reading it all into memory, and handles conditional requests
+            return send_file(artwork.Path, mimetype=mime, max_age=300, conditional=True)
+
+        elif artwork.BlobHash:
+            # The hash identifies the blob, so a client that already has it needn't be sent it again
+            # (and, as the blob is deferred, it needn't even be loaded from the database)
+            if request.if_none_match.contains(artwork.BlobHash):
+                response = Response(status=HTTPStatus.NOT_MODIFIED)
             else:
-                raise InternalServerError("Unknown mime type")
-
-            return Response(artwork.Blob, headers={'Cache-Control': 'max-age=300'}, mimetype=mime)
+                mime = artwork_blob_mimetype(artwork.Blob)
+                if mime is None:
+                    raise InternalServerError("Unknown mime type")
+                response = Response(artwork.Blob, mimetype=mime)
+            response.set_etag(artwork.BlobHash)
+            response.headers['Cache-Control'] = 'max-age=300'
+            return response
 
         else:
             raise NotFound("Unknown artwork id")
@@ -174,7 +311,8 @@ def get_artwork_info(artworkid):
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_TRACK_ID) from exc
 
-        has_artwork = (artwork.Path or artwork.Blob)
+        # BlobHash is always set alongside Blob, and checking it avoids loading the blob itself
+        has_artwork = (artwork.Path or artwork.BlobHash)
         rtn = {
             "width": artwork.Width,
             "height": artwork.Height,
@@ -203,14 +341,15 @@ def get_download_history():
 
 
 @routes.get("/genres/")
+@library_etag
 def get_all_genres():
-    with DatabaseAccess() as db:
-        rtn = []
-        for genre in db.get_all_genres():
-            rtn.append(json_genre(genre,
-                                  include_albums=InformationLevel.NoInfo,
-                                  include_playlists=InformationLevel.NoInfo))
-        return gzippable_jsonify(rtn)
+    def generate():
+        with DatabaseAccess() as db:
+            for genre in db.get_all_genres():
+                yield json_genre(genre,
+                                 include_albums=InformationLevel.NoInfo,
+                                 include_playlists=InformationLevel.NoInfo)
+    return gzippable_stream_jsonify(generate())
 
 
 @routes.get(RouteConstants.GET_GENRE)
@@ -233,12 +372,9 @@ def get_mp3(trackid):
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_TRACK_ID) from exc
 
-        with open(track.Filepath, 'rb') as handle:
-            content = handle.read()
-        response = make_response(content)
-        response.headers['Content-Type'] = 'audio/mpeg'
-        response.headers['Content-Length'] = len(content)
-        return response
+        # Stream the file rather than reading it all into memory; conditional=True also
+        # adds support for range requests, so that clients can seek
+        return send_file(track.Filepath, mimetype='audio/mpeg', conditional=True)
 
 
 @routes.post("/player/next")
@@ -280,22 +416,35 @@ def update_player_play():
         #   youtubeurl (with nothing else)
         #   radio (with nothing else)
 
-        if not any([albumid, playlistid, queue_pos, trackid, radioid, youtubeurl]):
+        selection = {name for name, value in (('album', albumid),
+                                              ('playlist', playlistid),
+                                              ('queuepos', queue_pos),
+                                              ('track', trackid),
+                                              ('radio', radioid))
+                     if value is not None}
+        if youtubeurl:
+            selection.add('url')
+
+        if not selection:
             raise BadRequest('Something to play must be specified')
 
-        if sum(x is not None for x in [albumid, playlistid, queue_pos]) > 1:
+        if len(selection & {'album', 'playlist', 'queuepos'}) > 1:
             raise BadRequest("At most one of album, playlist and queuepos may be specified")
 
-        if radioid and any([albumid, playlistid, queue_pos, trackid, youtubeurl]):
+        if 'radio' in selection and len(selection) > 1:
             raise BadRequest("A radio station may not be specified with any other track selection")
 
-        if youtubeurl and any([albumid, playlistid, queue_pos, trackid, radioid]):
+        if 'url' in selection and len(selection) > 1:
             raise BadRequest("A URL may not be specified with any other track selection")
 
+        # Queue positions start at 0, but database ids start at 1
+        if 0 in (albumid, playlistid, trackid, radioid):
+            raise BadRequest("Unrecognised id")
+
         if youtubeurl:
             update_player_play_from_youtube(youtubeurl)
 
-        elif radioid:
+        elif radioid is not None:
             update_player_play_from_radio(db, radioid)
 
         else:
@@ -361,13 +510,14 @@ def player_set_volume():
 
 
 @routes.get("/playlists/")
+@library_etag
+@library_cached('genres', 'tracks')
 def get_playlists():
     genre_info = InformationLevel.from_string(request.args.get('genres', ''), InformationLevel.NoInfo)
     tracks_info = InformationLevel.from_string(request.args.get('tracks', ''), InformationLevel.NoInfo)
     with DatabaseAccess() as db:
-        rtn = []
-        for playlist in db.get_all_playlists():
-            rtn.append(json_playlist(playlist, include_genres=genre_info, include_tracks=tracks_info))
+        rtn = [json_playlist(playlist, include_genres=genre_info, include_tracks=tracks_info)
+               for playlist in db.get_all_playlists()]
         return gzippable_jsonify(rtn)
 
 
@@ -375,8 +525,12 @@ def get_playlists():
 def add_playlist():
     with DatabaseAccess() as db:
         playlist, missing = build_playlist_from_api_data(db)
+        # Count the entries now: the commit expires them, and counting afterwards would reload them all
+        nr_tracks = len(playlist.Entries)
         db.create_playlist(playlist)
-        return response_for_import_playlist(playlist, missing)
+        response = response_for_import_playlist(playlist, nr_tracks, missing)
+    current_app.library_changed()
+    return response
 
 
 @routes.delete("/playlists/<playlistid>")
@@ -386,10 +540,12 @@ def delete_playlist(playlistid):
             db.delete_playlist(playlistid)
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_PLAYLIST_ID) from exc
-        return ('', HTTPStatus.NO_CONTENT)
+    current_app.library_changed()
+    return ('', HTTPStatus.NO_CONTENT)
 
 
 @routes.get(RouteConstants.GET_ONE_PLAYLIST)
+@library_cached('genres', 'tracks')
 def get_one_playlist(playlistid):
     genre_info = InformationLevel.from_string(request.args.get('genres', ''), InformationLevel.NoInfo)
     track_info = InformationLevel.from_string(request.args.get('tracks', ''), InformationLevel.Links)
@@ -405,8 +561,11 @@ def get_one_playlist(playlistid):
 def edit_playlist(playlistid):
     with DatabaseAccess() as db:
         playlist, missing = build_playlist_from_api_data(db)
+        nr_tracks = len(playlist.Entries)  # see add_playlist
         playlist = db.update_playlist(playlistid, playlist)
-        return response_for_import_playlist(playlist, missing)
+        response = response_for_import_playlist(playlist, nr_tracks, missing)
+    current_app.library_changed()
+    return response
 
 
 @routes.delete("/queue/", provide_automatic_options=False)
@@ -426,6 +585,7 @@ def queue_delete():
     if not current_app.current_player.remove_from_queue(index, trackid):
         # index or trackid mismatch
         raise BadRequest('Track id did not match at given index')
+    current_app.update_now_playing()
     return ('', HTTPStatus.NO_CONTENT)
 
 
@@ -434,8 +594,7 @@ def queue_get():
     if current_app.current_player != current_app.file_player:
         raise Conflict(ERR_MSG_NO_QUEUE_WHEN_STREAMING)
     with DatabaseAccess() as db:
-        queue_data = [json_track_or_file(db, queued_track) for
-                      queued_track in current_app.current_player.visible_queue]
+        queue_data = json_queue(db, current_app.current_player.visible_queue)
     return gzippable_jsonify(queue_data)
 
 
@@ -488,7 +647,6 @@ def queue_put_album(albumid: int, disknr: int):
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_ALBUM_ID) from exc
         tracks = [track for track in album.Tracks if track.VolumeNumber == disknr]
-        tracks.sort(key=lambda track: (track.VolumeNumber, track.TrackNumber))
         for track in tracks:
             add_track_to_queue(track)
         current_app.update_now_playing()
@@ -515,30 +673,30 @@ def queue_put_youtube(youtubeurl: str):
 
 
 def queue_put_reorder(new_queue_order: List[any]):
-    new_queue = []
+    try:
+        new_queue_order = [int(trackid) for trackid in new_queue_order]
+    except ValueError as exc:
+        raise BadRequest("Unrecognised track id") from exc
     with DatabaseAccess() as db:
         try:
-            for trackid in new_queue_order:
-                trackid = int(trackid)
-                if trackid >= 0:
-                    new_queue.append(db.get_track_by_id(trackid))
-                else:
-                    new_queue.append(DownloadInfoDatabaseSingleton().get_download_info(trackid))
+            # Fetch all the real tracks in one query, then interleave the downloaded files
+            tracks = iter(db.get_tracks_by_ids(trackid for trackid in new_queue_order if trackid >= 0))
+            download_info = DownloadInfoDatabaseSingleton()
+            new_queue = [next(tracks) if trackid >= 0 else download_info.get_download_info(trackid)
+                         for trackid in new_queue_order]
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_TRACK_ID) from exc
-        except ValueError as exc:
-            raise BadRequest("Unrecognised track id") from exc
         current_app.current_player.set_queue(new_queue, "/queue/")
     current_app.update_now_playing()
     return ('', HTTPStatus.NO_CONTENT)
 
 
 @routes.get("/radio/", provide_automatic_options=False)
+@library_etag
+@library_cached()
 def get_radio_stations():
     with DatabaseAccess() as db:
-        rtn = []
-        for station in db.get_all_radio_stations():
-            rtn.append(json_radio_station(station))
+        rtn = [json_radio_station(station) for station in db.get_all_radio_stations()]
         return gzippable_jsonify(rtn)
 
 
@@ -561,7 +719,8 @@ def add_radio_station():
         response = {
             'id': station.Id
         }
-        return gzippable_jsonify(response)
+    current_app.library_changed()
+    return gzippable_jsonify(response)
 
 
 @routes.put("/radio/", provide_automatic_options=False)
@@ -573,12 +732,16 @@ def radio_stations_put():
     desired_station_order = [extract_id(station) for station in desired_station_order]
     if None in desired_station_order:
         raise BadRequest("Unrecognised station id in list")
+    station_positions = {stationid: index for index, stationid in enumerate(desired_station_order)}
     with DatabaseAccess() as db:
         stations = db.get_all_radio_stations()
-        if len(desired_station_order) != len(stations) or len(set(desired_station_order)) != len(stations):
+        if (len(desired_station_order) != len(stations)
+                or len(station_positions) != len(stations)
+                or any(station.Id not in station_positions for station in stations)):
             raise BadRequest("Submitted list does not specify the order for all stations, or contains duplicates")
         for station in stations:
-            station.SortOrder = desired_station_order.index(station.Id)
+            station.SortOrder = station_positions[station.Id]
+    current_app.library_changed()
     return ('', HTTPStatus.NO_CONTENT)
 
 
@@ -589,10 +752,12 @@ def delete_one_radio_station(stationid):
             db.delete_radio_station(stationid)
         except NotFoundException as exc:
             raise NotFound(ERR_MSG_UNKNOWN_RADIO_ID) from exc
-        return ('', HTTPStatus.NO_CONTENT)
+    current_app.library_changed()
+    return ('', HTTPStatus.NO_CONTENT)
 
 
 @routes.get(RouteConstants.GET_ONE_RADIO_STATION)
+@library_cached('urls')
 def get_one_radio_station(stationid):
     infolevel = InformationLevel.from_string(request.args.get('urls', ''), InformationLevel.Links)
     include_urls = (infolevel in (InformationLevel.AllInfo, InformationLevel.DebugInfo))
@@ -609,7 +774,9 @@ def edit_radio_station(stationid):
     station = build_radio_station_from_api_data()
     with DatabaseAccess() as db:
         existing_station = db.update_radio_station(stationid, station)
-        return gzippable_jsonify(json_radio_station(existing_station))
+        response = gzippable_jsonify(json_radio_station(existing_station))
+    current_app.library_changed()
+    return response
 
 
 @routes.post("/scanner/scan")
@@ -635,7 +802,10 @@ def start_tidy():
 
 @routes.get("/search/<search_string>")
 def search(search_string):
-    search_words = normalize_punctuation(search_string).strip().split()
+    # Split the words once, for all three searches. Repeated words add nothing to the queries.
+    # The words keep their case: SQLite only folds ASCII case, so lower-casing them here
+    # would stop eg 'Édith' matching.
+    search_words = tuple(dict.fromkeys(normalize_punctuation(search_string).split()))
     do_search_albums = parse_bool(request.args.get('albums', 'True'))
     do_search_artists = parse_bool(request.args.get('artists', 'True'))
     do_search_tracks = parse_bool(request.args.get('tracks', 'True'))
@@ -645,8 +815,7 @@ def search(search_string):
             albums = db.search_for_albums(search_words)
             rtn['albums'] = [json_album(album, include_tracks=InformationLevel.NoInfo) for album in albums]
         if do_search_artists:
-            artist_albums = db.search_for_artist(search_words)
-            artists = set(album.Artist for album in artist_albums if album.Artist)
+            artists = db.search_for_artists(search_words)
             rtn['artists'] = [{"name": artist, "link": url_for(RouteConstants.GET_ARTIST, artist=artist)}
                               for artist in artists]
         if do_search_tracks:
@@ -656,17 +825,19 @@ def search(search_string):
 
 
 @routes.get("/tracks/")
+@library_etag
 def get_all_tracks():
     limit = request.args.get('limit', '')
     if limit and limit.isdigit():
         limit = int(limit)
     else:
         limit = None
-    with DatabaseAccess() as db:
-        rtn = []
-        for track in db.get_all_tracks(limit):
-            rtn.append(json_track(track))
-        return gzippable_jsonify(rtn)
+
+    def generate():
+        with DatabaseAccess() as db:
+            for track in db.get_all_tracks(limit):
+                yield json_track(track)
+    return gzippable_stream_jsonify(generate())
 
 
 @routes.get(RouteConstants.GET_TRACK)
@@ -683,9 +854,8 @@ def get_track(trackid):
 
 @sock.route('/ws', routes)
 def websocket_client(ws):
-    sock.app.websocket_clients.append(ws)
-    data = get_current_status()
-    ws.send(json.dumps(data))
+    sock.app.websocket_clients.add(ws)
+    ws.send(get_current_status_message())
     while True:
         _ = ws.receive()
         # discard incoming requests on the websocket for now
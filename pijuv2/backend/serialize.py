@@ -6,7 +6,7 @@ an over-the-wire representation
 from functools import lru_cache
 import os.path
 
-from .routeconsts import RouteConstants, url_for
+from .routeconsts import RouteConstants, url_for, url_for_ids
 
 from ..database.schema import Album, Genre, Playlist, RadioStation, Track
 
@@ -19,30 +19,19 @@ class InformationLevel:
 
     @staticmethod
     def from_string(info: str, default: 'InformationLevel' = Links):
-        info = info.lower()
-        if info == 'none':
-            return InformationLevel.NoInfo
-        elif info == 'links':
-            return InformationLevel.Links
-        elif info == 'all':
-            return InformationLevel.AllInfo
-        elif info == 'debug':
-            return InformationLevel.DebugInfo
-        else:
-            return default
+        return INFORMATION_LEVELS.get(info.lower(), default)
 
 
-@lru_cache(maxsize=32)
-def json_album(album: Album, include_tracks: InformationLevel):
-    tracks = list(album.Tracks)
-    tracks = sorted(tracks, key=lambda track: (track.VolumeNumber or 0, track.TrackNumber or 0))
-    for track in tracks:
-        if bool(track.Artwork):
-            artwork_uri = url_for(RouteConstants.GET_ARTWORK, artworkid=track.Artwork)
-            break
-    else:
-        artwork_uri = None
+INFORMATION_LEVELS = {
+    'none': InformationLevel.NoInfo,
+    'links': InformationLevel.Links,
+    'all': InformationLevel.AllInfo,
+    'debug': InformationLevel.DebugInfo,
+}
+
 
+def json_album(album: Album, include_tracks: InformationLevel):
+    artwork_uri = url_for(RouteConstants.GET_ARTWORK, artworkid=album.Artwork) if album.Artwork else None
     rtn = {
         'link': url_for(RouteConstants.GET_ALBUM, albumid=album.Id),
         'artist': album.Artist,
@@ -53,13 +42,13 @@ def json_album(album: Album, include_tracks: InformationLevel):
         'artwork': {
             'link': artwork_uri,
         },
-        'genres': [url_for(RouteConstants.GET_GENRE, genreid=genre.Id) for genre in album.Genres],
+        'genres': url_for_ids(RouteConstants.GET_GENRE, (genre.Id for genre in album.Genres)),
     }
     if include_tracks == InformationLevel.Links:
-        rtn['tracks'] = [url_for(RouteConstants.GET_TRACK, trackid=track.Id) for track in tracks]
+        rtn['tracks'] = url_for_ids(RouteConstants.GET_TRACK, (track.Id for track in album.Tracks))
     elif include_tracks in (InformationLevel.AllInfo, InformationLevel.DebugInfo):
         include_debuginfo = (include_tracks == InformationLevel.DebugInfo)
-        rtn['tracks'] = [json_track(track, include_debuginfo=include_debuginfo) for track in tracks]
+        rtn['tracks'] = [json_track(track, include_debuginfo=include_debuginfo) for track in album.Tracks]
     return rtn
 
 
@@ -70,11 +59,12 @@ def json_genre(genre: Genre, include_albums: InformationLevel, include_playlists
         'name': genre.Name,
     }
     if include_albums == InformationLevel.Links:
-        rtn['albums'] = [url_for(RouteConstants.GET_ALBUM, albumid=album.Id) for album in genre.Albums]
+        rtn['albums'] = url_for_ids(RouteConstants.GET_ALBUM, (album.Id for album in genre.Albums))
     elif include_albums in (InformationLevel.AllInfo, InformationLevel.DebugInfo):
         rtn['albums'] = [json_album(album, include_tracks=include_albums) for album in genre.Albums]
     if include_playlists == InformationLevel.Links:
-        rtn['playlists'] = [url_for(RouteConstants.GET_ONE_PLAYLIST, playlistid=playlist.Id) for playlist in genre.Playlists]
+        rtn['playlists'] = url_for_ids(RouteConstants.GET_ONE_PLAYLIST,
+                                       (playlist.Id for playlist in genre.Playlists))
     elif include_playlists in (InformationLevel.AllInfo, InformationLevel.DebugInfo):
         rtn['playlists'] = [json_playlist(playlist,
                                           include_genres=InformationLevel.NoInfo,
@@ -91,13 +81,13 @@ def json_playlist(playlist: Playlist, include_genres: InformationLevel, include_
         'title': playlist.Title,
     }
     if include_genres == InformationLevel.Links:
-        rtn['genres'] = [url_for(RouteConstants.GET_GENRE, genreid=genre.Id) for genre in playlist.Genres]
+        rtn['genres'] = url_for_ids(RouteConstants.GET_GENRE, (genre.Id for genre in playlist.Genres))
     elif include_genres in (InformationLevel.AllInfo, InformationLevel.DebugInfo):
         rtn['genres'] = [json_genre(genre,
                                     include_albums=InformationLevel.NoInfo,
                                     include_playlists=InformationLevel.NoInfo) for genre in playlist.Genres]
     if include_tracks == InformationLevel.Links:
-        rtn['tracks'] = [url_for(RouteConstants.GET_TRACK, trackid=entry.TrackId) for entry in entries]
+        rtn['tracks'] = url_for_ids(RouteConstants.GET_TRACK, (entry.TrackId for entry in entries))
     elif include_tracks in (InformationLevel.AllInfo, InformationLevel.DebugInfo):
         include_debuginfo = (include_tracks == InformationLevel.DebugInfo)
         rtn['tracks'] = [json_track(entry.Track, include_debuginfo=include_debuginfo) for entry in entries]
@@ -120,11 +110,10 @@ def json_radio_station(station: RadioStation, include_urls: bool = False):
     return rtn
 
 
-@lru_cache(maxsize=32)
 def json_track(track: Track, include_debuginfo: bool = False):
     if not track:
         return {}
-    has_artwork = bool(track.Artwork)
+    artworkid = track.Artwork
     rtn = {
         'link': url_for(RouteConstants.GET_TRACK, trackid=track.Id),
         'artist': track.Artist,
@@ -135,8 +124,8 @@ def json_track(track: Track, include_debuginfo: bool = False):
         'trackcount': track.TrackCount,
         'fileformat': os.path.splitext(track.Filepath)[1],
         'album': url_for(RouteConstants.GET_ALBUM, albumid=track.Album) if track.Album else '',
-        'artwork': url_for(RouteConstants.GET_ARTWORK, artworkid=track.Artwork) if has_artwork else None,
-        'artworkinfo': url_for(RouteConstants.GET_ARTWORK_INFO, artworkid=track.Artwork) if has_artwork else None,
+        'artwork': url_for(RouteConstants.GET_ARTWORK, artworkid=artworkid) if artworkid else None,
+        'artworkinfo': url_for(RouteConstants.GET_ARTWORK_INFO, artworkid=artworkid) if artworkid else None,
     }
     if include_debuginfo:
         rtn['filepath'] = track.Filepath
@@ -150,20 +139,39 @@ def json_track_or_file(db, queued_track, include_debuginfo: bool = False):
         track = db.get_track_by_id(queued_track.trackid)
         return json_track(track, include_debuginfo)
     else:
-        # A fake track
-        rtn = {
-            'link': url_for(RouteConstants.GET_TRACK, trackid=queued_track.trackid),
-            'artist': queued_track.artist,
-            'title': queued_track.title,
-            'genre': None,
-            'disknumber': None,
-            'tracknumber': None,
-            'trackcount': None,
-            'fileformat': os.path.splitext(queued_track.filepath)[1],
-            'album': None,
-            'artwork': queued_track.artwork,
-            'artworkinfo': None
-        }
-        if include_debuginfo:
-            rtn['filepath'] = queued_track.filepath
-        return rtn
+        return json_downloaded_file(queued_track, include_debuginfo)
+
+
+def json_downloaded_file(queued_track, include_debuginfo: bool = False):
+    """
+    The json for a fake track, ie a downloaded file that is not in the database
+    """
+    rtn = {
+        'link': url_for(RouteConstants.GET_TRACK, trackid=queued_track.trackid),
+        'artist': queued_track.artist,
+        'title': queued_track.title,
+        'genre': None,
+        'disknumber': None,
+        'tracknumber': None,
+        'trackcount': None,
+        'fileformat': os.path.splitext(queued_track.filepath)[1],
+        'album': None,
+        'artwork': queued_track.artwork,
+        'artworkinfo': None
+    }
+    if include_debuginfo:
+        rtn['filepath'] = queued_track.filepath
+    return rtn
+
+
+def json_queue(db, queued_tracks, include_debuginfo: bool = False):
+    """
+    Equivalent to [json_track_or_file(db, queued_track) for queued_track in queued_tracks],
+    but fetching all the real tracks with a single query
+    """
+    queued_tracks = list(queued_tracks)
+    tracks = iter(db.get_tracks_by_ids(queued_track.trackid for queued_track in queued_tracks
+                                       if queued_track.trackid >= 0))
+    return [json_track(next(tracks), include_debuginfo) if queued_track.trackid >= 0
+            else json_downloaded_file(queued_track, include_debuginfo)
+            for queued_track in queued_tracks]
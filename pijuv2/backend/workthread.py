@@ -2,6 +2,7 @@ import logging
 import pathlib
 from queue import Queue
 import threading
+import time
 
 from ..database.database import DatabaseAccess
 from ..database.tidy import delete_missing_tracks, delete_albums_without_tracks, delete_empty_genres
@@ -10,12 +11,23 @@ from .workrequests import WorkRequests
 from .ytdlp import fetch_audio
 
 
+# Work requests that may change the albums, tracks or genres in the database
+LIBRARY_WORK_REQUESTS = (WorkRequests.SCAN_DIRECTORY,
+                         WorkRequests.DELETE_MISSING_TRACKS,
+                         WorkRequests.DELETE_ALBUMS_WITHOUT_TRACKS,
+                         WorkRequests.DELETE_EMPTY_GENRES)
+
+# How often to flag the library as changed while a scan is still committing tracks
+SCAN_LIBRARY_CHANGE_INTERVAL = 5.0  # seconds
+
+
 class WorkerThread(threading.Thread):
     def __init__(self, app, work_queue: Queue):
         super().__init__(name='WorkerThread', daemon=True)
         self.app = app
         self.work_queue = work_queue
         self.current_status = 'Not started'
+        self.last_library_change = 0.0  # time.monotonic()
 
     def run(self):
         print(f"WorkerThread: id={threading.get_native_id()} ident={threading.current_thread().ident}")
@@ -23,13 +35,15 @@ class WorkerThread(threading.Thread):
             self.set_current_status('Idle')
             request = self.work_queue.get()
 
+            modifies_library = request[0] in LIBRARY_WORK_REQUESTS
             with self.app.app_context():
                 with DatabaseAccess() as db:
                     match request[0]:
                         case WorkRequests.SCAN_DIRECTORY:
                             dir_to_scan = pathlib.Path(request[1])
                             self.set_current_status(f'Scanning {dir_to_scan}')
-                            scan_directory(dir_to_scan, db)
+                            self.last_library_change = time.monotonic()
+                            scan_directory(dir_to_scan, db, track_saved_callback=self.scanned_track_saved)
 
                         case WorkRequests.DELETE_MISSING_TRACKS:
                             self.set_current_status('Deleting missing tracks')
@@ -55,6 +69,18 @@ class WorkerThread(threading.Thread):
                         case _:
                             logging.error(f"Unrecognised request: {request[0]}")
 
+            # Only flag the change once DatabaseAccess has committed it
+            if modifies_library:
+                self.app.library_changed()
+
+    def scanned_track_saved(self):
+        # Tracks are committed as they are scanned, so clients needn't wait for the whole scan to see them.
+        # Anything still uncommitted at the last change is picked up by the change at the end of the scan.
+        now = time.monotonic()
+        if now - self.last_library_change > SCAN_LIBRARY_CHANGE_INTERVAL:
+            self.last_library_change = now
+            self.app.library_changed()
+
     def set_current_status(self, status: str):
         self.current_status = status
         self.app.update_now_playing()
@@ -32,16 +32,15 @@ def fetch_audio(url, download_dir) -> Iterable[DownloadInfo]:
     local_files = result.stdout.splitlines()
     all_download_info = []
     for local_file in local_files:
-        filepath = Path(local_file)
-        metadata_path = filepath.with_suffix('.info.json')
+        metadata_path = Path(local_file).with_suffix('.info.json')
         with open(metadata_path, encoding='utf-8') as handle:
             metadata = json.load(handle)
             artist = metadata.get('artist')
             title = metadata.get('title')
             artwork = select_thumbnail(metadata.get('thumbnails'))
             url = metadata.get('webpage_url')
-        fake_trackid = DownloadInfoDatabaseSingleton().get_id_for_filepath(filepath)
-        one_download_info = DownloadInfo(filepath, artist, title, artwork, url, fake_trackid)
+        fake_trackid = DownloadInfoDatabaseSingleton().get_id_for_filepath(local_file)
+        one_download_info = DownloadInfo(local_file, artist, title, artwork, url, fake_trackid)
         all_download_info.append(one_download_info)
         DownloadInfoDatabaseSingleton().add_download_info(fake_trackid, one_download_info)
     return all_download_info
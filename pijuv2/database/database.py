@@ -1,11 +1,12 @@
 import hashlib
 import logging
-from typing import Any, Callable, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from flask_sqlalchemy import SQLAlchemy
 
 from sqlalchemy import func, select, or_
 from sqlalchemy.sql.expression import true
+from sqlalchemy.orm import selectinload, undefer
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 
 from .schema import Base, Album, Artwork, Genre, Playlist, RadioStation, Track
@@ -287,12 +288,24 @@ class Database():
 
         return track
 
-    def get_album_by_id(self, albumid: int) -> Album:
+    def get_album_by_id(self, albumid: int, track_ids_only: bool = False) -> Album:
         """
         Return the Album object for a given id.
+        If track_ids_only is set, only the Id of each of the album's tracks is loaded
+        up front: any other track attribute is then loaded on first access.
         Raises NotFoundException for an unknown id
         """
-        return self.get_x_by_id(Album, albumid)
+        if not track_ids_only:
+            return self.get_x_by_id(Album, albumid)
+        res = Database.db.session.query(Album).options(
+            selectinload(Album.Tracks).load_only(Track.Id)
+        ).filter(
+            Album.Id == albumid
+        )
+        try:
+            return res.one()
+        except Exception as exc:
+            raise convert_exception_class(exc) from exc
 
     def get_artwork_by_id(self, artworkid: int) -> Artwork:
         """
@@ -311,7 +324,11 @@ class Database():
         """
         Primarily for debugging
         """
-        result = Database.db.session.execute(select(Album).order_by(Album.Artist, Album.Title))
+        # Load the genres of all albums in one query, rather than one query per album.
+        # Tracks are left to load on demand: listing albums only needs Album.Artwork
+        result = Database.db.session.execute(select(Album)
+                                             .options(selectinload(Album.Genres), undefer(Album.Artwork))
+                                             .order_by(Album.Artist, Album.Title))
         return result.scalars().all()
 
     def get_all_artworks(self) -> List[Artwork]:
@@ -332,7 +349,9 @@ class Database():
         """
         Primarily for debugging
         """
-        result = Database.db.session.execute(select(Playlist).order_by(Playlist.Title))
+        result = Database.db.session.execute(select(Playlist)
+                                             .options(selectinload(Playlist.Entries), selectinload(Playlist.Genres))
+                                             .order_by(Playlist.Title))
         return result.scalars().all()
 
     def get_all_tracks(self, limit=None) -> List[Track]:
@@ -382,6 +401,7 @@ class Database():
         if substring:
             search_string = '%' + search_string + '%'
         return (Database.db.session.query(Album)
+                .options(undefer(Album.Artwork))
                 .filter(Album.Artist.ilike(search_string))
                 .order_by(Album.Artist)
                 .limit(limit)
@@ -393,6 +413,7 @@ class Database():
         """
         result = Database.db.session.execute(
             select(Album)
+            .options(undefer(Album.Artwork))
             .where(Album.IsCompilation == true())
             .order_by(Album.Title)
             .limit(limit)
@@ -425,6 +446,14 @@ class Database():
         """
         return self.get_x_by_id(Genre, genreid)
 
+    def get_genres_by_ids(self, genreids: Iterable[int]) -> List[Genre]:
+        """
+        Return the Genre objects for the given ids, in no particular order, using a single query.
+        Unknown ids are ignored.
+        """
+        result = Database.db.session.execute(select(Genre).where(Genre.Id.in_(set(genreids))))
+        return result.scalars().all()
+
     def get_playlist_by_id(self, playlistid: int) -> Playlist:
         """
         Return the Playlist object for a given id.
@@ -442,6 +471,19 @@ class Database():
         """
         return self.get_x_by_id(Track, trackid)
 
+    def get_tracks_by_ids(self, trackids: Iterable[int]) -> List[Track]:
+        """
+        Return the Track objects for the given ids, in the same order, using a single query.
+        Raises NotFoundException if any id is unknown
+        """
+        trackids = list(trackids)
+        result = Database.db.session.execute(select(Track).where(Track.Id.in_(set(trackids))))
+        tracks = {track.Id: track for track in result.scalars()}
+        try:
+            return [tracks[trackid] for trackid in trackids]
+        except KeyError as exc:
+            raise NotFoundException(f"Track {exc.args[0]} does not exist") from exc
+
     def get_track_by_filepath(self, path: str) -> Track:
         """
         Return the Track object for a given file path,
@@ -452,9 +494,32 @@ class Database():
         )
         return res.one_or_none()
 
+    def get_tracks_by_filepaths(self, paths: Iterable[str]) -> Dict[str, Track]:
+        """
+        Equivalent to {path: get_track_by_filepath(path) for path in paths}, but
+        using a single query, and omitting any path that has no match in the database.
+        """
+        paths = list(paths)
+        result = Database.db.session.execute(select(Track).where(
+            func.lower(Track.Filepath).in_([func.lower(path) for path in paths])
+        ))
+        # SQLite's lower() only folds ASCII characters, as does bytes.lower(),
+        # so use that to match the paths found to the paths requested
+        tracks = {track.Filepath.encode().lower(): track for track in result.scalars()}
+        return {path: tracks[key] for path in paths if (key := path.encode().lower()) in tracks}
+
     def get_nr_albums(self):
         return Database.db.session.query(Album).with_entities(func.count(Album.Id)).scalar()
 
+    def get_nr_albums_artworks_tracks(self) -> Tuple[int, int, int]:
+        """
+        Equivalent to (get_nr_albums(), get_nr_artworks(), get_nr_tracks()), but with a single query
+        """
+        query = select(select(func.count(Album.Id)).scalar_subquery(),
+                       select(func.count(Artwork.Id)).scalar_subquery(),
+                       select(func.count(Track.Id)).scalar_subquery())
+        return tuple(Database.db.session.execute(query).one())
+
     def get_nr_artworks(self):
         return Database.db.session.query(Artwork).with_entities(func.count(Artwork.Id)).scalar()
 
@@ -469,24 +534,24 @@ class Database():
         Return a list of Album objects where the album title
         or the artist name matches the given search words.
         """
-        query = Database.db.session.query(Album)
+        query = Database.db.session.query(Album).options(undefer(Album.Artwork))
         for word in search_words:
             pattern = '%' + word + '%'
             query = query.filter(or_(Album.Title.ilike(pattern), Album.Artist.ilike(pattern)))
         query = query.order_by(Album.Artist).limit(limit)
         return query.all()
 
-    def search_for_artist(self, search_words: Iterable[str], limit=100) -> List[Album]:
+    def search_for_artists(self, search_words: Iterable[str], limit=100) -> List[str]:
         """
-        Return a list of Album objects where the artist
-        matches the given search words.
+        Return a list of the distinct album artist names
+        that match the given search words.
         """
-        query = Database.db.session.query(Album)
+        query = select(Album.Artist).distinct().where(Album.Artist.is_not(None), Album.Artist != '')
         for word in search_words:
             pattern = '%' + word + '%'
-            query = query.filter(Album.Artist.ilike(pattern))
+            query = query.where(Album.Artist.ilike(pattern))
         query = query.order_by(Album.Artist).limit(limit)
-        return query.all()
+        return Database.db.session.execute(query).scalars().all()
 
     def search_for_tracks(self, search_words: Iterable[str], query_limit=1000, return_limit=100) -> List[Track]:
         """
@@ -1,6 +1,6 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, LargeBinary, String, Table
-from sqlalchemy import event
-from sqlalchemy.orm import declarative_base, relationship, Session
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Table
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import column_property, declarative_base, deferred, relationship, Session
 
 # IMPORTANT: If changing the schema, be sure to create the alembic revision to support the migration of data
 # Run:
@@ -53,7 +53,9 @@ class Album(Base):
     MusicBrainzAlbumArtistId = Column(String)
     ReleaseYear = Column(Integer)
     IsCompilation = Column(Boolean)
-    Tracks = relationship("Track")
+    # Have the database return tracks in album order, rather than sorting them in Python
+    Tracks = relationship("Track",
+                          order_by=lambda: (func.coalesce(Track.VolumeNumber, 0), func.coalesce(Track.TrackNumber, 0)))
     Genres = relationship("Genre",
                           secondary=album_genre_association_table,
                           back_populates="Albums")
@@ -106,12 +108,33 @@ class Track(Base):
     ArtworkObject = relationship("Artwork", back_populates="Tracks")
 
 
+# Finds an album's tracks, in album order, without scanning (and sorting) the whole table
+Index('ix_Tracks_Album', Track.Album, Track.VolumeNumber, Track.TrackNumber)
+
+
+# The artwork of an album is that of its first track (in album order) that has any.
+# Having the database work that out means listing albums doesn't need to load all their tracks.
+# It's deferred, as most album loads (eg during a scan) don't need it: queries that list
+# albums for serialization undefer it.
+# SQLite sorts NULLs first, so a missing disk or track number still sorts ahead of any other,
+# and ordering on the plain columns lets ix_Tracks_Album provide the order.
+Album.Artwork = column_property(
+    select(Track.Artwork)
+    .where(Track.Album == Album.Id, Track.Artwork.is_not(None))
+    .order_by(Track.VolumeNumber, Track.TrackNumber)
+    .limit(1)
+    .correlate_except(Track)
+    .scalar_subquery(),
+    deferred=True
+)
+
+
 class Artwork(Base):
     __tablename__ = 'Artwork'
 
     Id = Column(Integer, primary_key=True)
     Path = Column(String)  # either this or the next will be populated
-    Blob = Column(LargeBinary)
+    Blob = deferred(Column(LargeBinary))  # only loaded on access: artwork can be large
     BlobHash = Column(String)
     Width = Column(Integer)
     Height = Column(Integer)
@@ -91,7 +91,7 @@ class FilePlayer(PlayerInterface):
             self.queue = []
             for item in new_queue:
                 if isinstance(item, DownloadInfo):
-                    queue_item = QueuedTrack(str(item.filepath),
+                    queue_item = QueuedTrack(item.filepath,
                                              item.fake_trackid,
                                              item.artist,
                                              item.title,
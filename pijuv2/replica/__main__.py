@@ -9,7 +9,8 @@ import urllib.parse
 from flask import abort, Flask, request
 import requests
 
-from ..backend.__main__ import extract_id, gzippable_jsonify
+from ..backend.deserialize import extract_id
+from ..backend.routes import gzippable_jsonify
 from ..player.fileplayer import MusicPlayer
 
 app = Flask(__name__)
@@ -1,5 +1,5 @@
 import pathlib
-from typing import Optional
+from typing import Callable, Optional
 
 from ..database.database import Database
 from ..database.schema import Album, Artwork, Track
@@ -39,7 +39,8 @@ def set_cross_refs(db: Database, track: Track, albumref: Album, artworkref: Opti
             album.Genres.append(genre)
 
 
-def scan_directory(basedir: pathlib.Path, db: Database, limit: int = None):
+def scan_directory(basedir: pathlib.Path, db: Database, limit: int = None,
+                   track_saved_callback: Optional[Callable[[], None]] = None):
     count = 0
     for (pattern, scanner) in [('*.mp3', scan_mp3),
                                ('*.m4a', scan_m4a)]:
@@ -50,6 +51,8 @@ def scan_directory(basedir: pathlib.Path, db: Database, limit: int = None):
                 if existing_track is not None:
                     track.Id = existing_track.Id
                 set_cross_refs(db, track, albumref, artworkref)
+                if track_saved_callback:
+                    track_saved_callback()
             count += 1
             if (limit is not None) and (count >= limit):
                 return
@@ -1,10 +1,18 @@
 # pylint: disable=redefined-outer-name,unnecessary-dunder-call,unused-argument
 from unittest.mock import MagicMock, patch
 
+import gzip
+import json
+
 import pytest
 
 from pijuv2.backend.appfactory import create_app
-from pijuv2.database.database import DatabaseAccess
+from pijuv2.backend.nowplaying import get_current_status_message
+from pijuv2.backend.routes import artwork_blob_mimetype, gzippable_jsonify, GZIP_MIN_SIZE, normalize_punctuation
+from pijuv2.backend.workthread import SCAN_LIBRARY_CHANGE_INTERVAL, WorkerThread
+from pijuv2.database.database import Database, DatabaseAccess
+from pijuv2.database.schema import Album, Artwork, RadioStation, Track
+from pijuv2.player.fileplayer import QueuedTrack
 
 
 @pytest.fixture()
@@ -101,3 +109,450 @@ def test_get_track_with_artwork(client, mock_track12):
     assert response.status_code == 200
     assert response.json['artwork'] == '/artwork/6'
     assert response.json['artworkinfo'] == '/artworkinfo/6'
+
+
+def test_small_response_is_not_gzipped(test_app):
+    with test_app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = gzippable_jsonify({'volume': 50})
+    assert 'Content-Encoding' not in response.headers
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'{"volume":50}'
+    assert response.content_length == len(b'{"volume":50}')
+
+
+def test_large_response_is_gzipped(test_app):
+    content = ['x' * GZIP_MIN_SIZE]
+    with test_app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = gzippable_jsonify(content)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.mimetype == 'application/json'
+    assert gzip.decompress(response.get_data()) == b'["' + b'x' * GZIP_MIN_SIZE + b'"]'
+    assert response.content_length == len(response.get_data())
+
+
+def test_large_response_is_not_gzipped_if_not_accepted(test_app):
+    content = ['x' * GZIP_MIN_SIZE]
+    with test_app.test_request_context():
+        response = gzippable_jsonify(content)
+    assert 'Content-Encoding' not in response.headers
+
+
+@pytest.mark.parametrize("blob, expected",
+                         [(b'\xff\xd8\xff\xe0\x00\x10JFIF', 'image/jpeg'),
+                          (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', 'image/png'),
+                          (b'\x89PNx\r\n\x1a\n', None),
+                          (b'\x89PNG\x00\x00\x00\x00', None),
+                          (b'GIF89a', 'image/gif'),
+                          (b'\xff\xd8', None),
+                          (b'\x00\xff\xd8\xff\xe0', None),
+                          (b'', None)])
+def test_artwork_blob_mimetype(blob, expected):
+    assert artwork_blob_mimetype(blob) == expected
+
+
+@pytest.mark.parametrize("filename", ['cover.png', 'COVER.PNG'])
+def test_get_artwork_from_file(client, mock_dbaccess, tmp_path, filename):
+    artwork_path = tmp_path / filename
+    artwork_path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+    mock_artwork = MagicMock()
+    mock_artwork.Path = str(artwork_path)
+    mock_dbaccess().__enter__().get_artwork_by_id.return_value = mock_artwork
+    response = client.get('/artwork/6')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.cache_control.max_age == 300
+    assert response.get_data() == artwork_path.read_bytes()
+
+
+def test_library_list_is_not_resent_if_unchanged(client, real_db):
+    response = client.get('/albums/')
+    assert response.status_code == 200
+    etag, _ = response.get_etag()
+    response = client.get('/albums/', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+
+
+def test_library_list_is_resent_after_library_change(client, real_db, test_app):
+    response = client.get('/genres/')
+    assert response.json == []
+    etag, _ = response.get_etag()
+    test_app.library_changed()
+    response = client.get('/genres/', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 200
+    assert response.json == []
+    assert response.get_etag()[0] != etag
+
+
+def test_status_counts_are_refreshed_after_library_change(client, real_db, test_app):
+    assert client.get('/').json['NumberAlbums'] == 0
+    with real_db() as db:
+        db.ensure_album_exists(Album(Artist='Bill and Ben', Title='Flowerpot', IsCompilation=False))
+    test_app.library_changed()
+    assert client.get('/').json['NumberAlbums'] == 1
+
+
+def test_library_changes_during_scan_at_most_once_per_interval(test_app):
+    worker = WorkerThread(test_app, None)
+    version = test_app.library_version
+    with patch('pijuv2.backend.workthread.time.monotonic') as mock_monotonic:
+        mock_monotonic.return_value = SCAN_LIBRARY_CHANGE_INTERVAL + 1
+        worker.scanned_track_saved()
+        worker.scanned_track_saved()
+        assert test_app.library_version == version + 1
+        mock_monotonic.return_value = 2 * SCAN_LIBRARY_CHANGE_INTERVAL + 2
+        worker.scanned_track_saved()
+        assert test_app.library_version == version + 2
+
+
+def test_get_all_tracks_empty(client, real_db):
+    response = client.get('/tracks/')
+    assert response.status_code == 200
+    assert response.json == []
+
+
+def test_get_all_tracks(client, real_db):
+    with real_db() as db:
+        for title in ['Track 1', 'Track 2']:
+            db.ensure_track_exists(Track(Title=title, Filepath=f'/music/{title}.mp3'))
+    response = client.get('/tracks/')
+    assert response.status_code == 200
+    assert [track['title'] for track in response.json] == ['Track 1', 'Track 2']
+
+
+def test_get_all_tracks_gzipped(client, real_db):
+    with real_db() as db:
+        db.ensure_track_exists(Track(Title='Track 1', Filepath='/music/Track 1.mp3'))
+    response = client.get('/tracks/', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    tracks = json.loads(gzip.decompress(response.get_data()))
+    assert [track['title'] for track in tracks] == ['Track 1']
+
+
+def test_get_all_genres(client, real_db):
+    with real_db() as db:
+        for name in ['Rock', 'Jazz']:
+            db.ensure_genre_exists(name)
+    response = client.get('/genres/')
+    assert response.status_code == 200
+    assert [genre['name'] for genre in response.json] == ['Jazz', 'Rock']
+
+
+def test_get_all_albums(client, real_db):
+    with real_db() as db:
+        album = db.ensure_album_exists(Album(Artist='Bill and Ben', Title='Flowerpot', IsCompilation=False))
+        genre = db.ensure_genre_exists('Rock')
+        album.Genres = [genre]
+        artwork = db.ensure_artwork_exists(Artwork(Path='/music/cover.jpg', Width=1, Height=1))
+        db.ensure_track_exists(Track(Title='Track 1', Filepath='/music/Track 1.mp3', Album=album.Id,
+                                     Artwork=artwork.Id))
+    response = client.get('/albums/')
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert response.json[0]['title'] == 'Flowerpot'
+    assert response.json[0]['artwork']['link'] == f'/artwork/{artwork.Id}'
+    assert response.json[0]['genres'] == [f'/genres/{genre.Id}']
+
+
+def test_library_list_is_cached_until_library_change(client, real_db, test_app):
+    with real_db() as db:
+        db.add_radio_station(RadioStation(Name='Radio 1', SortOrder=0))
+    assert [station['name'] for station in client.get('/radio/').json] == ['Radio 1']
+    with real_db() as db:
+        db.add_radio_station(RadioStation(Name='Radio 2', SortOrder=1))
+    assert [station['name'] for station in client.get('/radio/').json] == ['Radio 1']
+    test_app.library_changed()
+    assert [station['name'] for station in client.get('/radio/').json] == ['Radio 1', 'Radio 2']
+
+
+def test_streamed_library_list_is_not_cached(client, real_db, test_app):
+    with real_db() as db:
+        db.ensure_genre_exists('Rock')
+    assert [genre['name'] for genre in client.get('/genres/').json] == ['Rock']
+    with real_db() as db:
+        db.ensure_genre_exists('Jazz')
+    assert [genre['name'] for genre in client.get('/genres/').json] == ['Jazz', 'Rock']
+    assert not test_app.library_cache
+
+
+def test_get_artwork_blob_is_not_resent_if_unchanged(client, mock_dbaccess):
+    mock_artwork = MagicMock()
+    mock_artwork.Path = None
+    mock_artwork.Blob = b'\xff\xd8\xff\xe0\x00\x10JFIF'
+    mock_artwork.BlobHash = 'abc123'
+    mock_dbaccess().__enter__().get_artwork_by_id.return_value = mock_artwork
+    response = client.get('/artwork/6')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    assert response.get_data() == mock_artwork.Blob
+    etag, _ = response.get_etag()
+    assert etag == 'abc123'
+    response = client.get('/artwork/6', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+
+
+def test_status_reflects_player_changes(client, real_db, test_app):
+    assert client.get('/').json['PlayerVolume'] == 100
+    test_app.current_player.current_volume = 50
+    assert client.get('/').json['PlayerVolume'] == 50
+
+
+def test_add_playlist_from_files(client, real_db, test_app):
+    music_dir = test_app.piju_config.music_dir
+    with real_db() as db:
+        genre = db.ensure_genre_exists('Rock')
+        db.ensure_track_exists(Track(Title='Track 1', Filepath=str(music_dir / 'Track 1.mp3'), Genre=genre.Id))
+    response = client.post('/playlists/', json={'title': 'My Playlist', 'files': ['Track 1.mp3', 'Track 2.mp3']})
+    assert response.status_code == 200
+    assert response.json['nrtracks'] == 1
+    assert response.json['missing'] == ['Track 2.mp3']
+    with real_db() as db:
+        playlist = db.get_playlist_by_id(response.json['playlistid'])
+        assert [genre.Name for genre in playlist.Genres] == ['Rock']
+
+
+def test_get_mp3_supports_range_requests(client, mock_track12, tmp_path):
+    mp3_path = tmp_path / 'track.mp3'
+    mp3_path.write_bytes(bytes(range(256)))
+    mock_track12.Filepath = str(mp3_path)
+    response = client.get('/mp3/12')
+    assert response.status_code == 200
+    assert response.mimetype == 'audio/mpeg'
+    assert response.get_data() == mp3_path.read_bytes()
+    response.close()
+    response = client.get('/mp3/12', headers={'Range': 'bytes=16-31'})
+    assert response.status_code == 206
+    assert response.get_data() == bytes(range(16, 32))
+    response.close()
+
+
+def test_normalize_punctuation():
+    assert normalize_punctuation('\u2018Don\u2019t\u2019 \u201cStop\u201d') == '\'Don\'t\' "Stop"'
+
+
+def test_reorder_radio_stations(client, real_db):
+    with real_db() as db:
+        stationids = [db.add_radio_station(RadioStation(Name=name, SortOrder=index)).Id
+                      for index, name in enumerate(['Radio 1', 'Radio 2', 'Radio 3'])]
+    response = client.put('/radio/', json=[f'/radio/{stationid}' for stationid in reversed(stationids)])
+    assert response.status_code == 204
+    with real_db() as db:
+        assert [station.Name for station in db.get_all_radio_stations()] == ['Radio 3', 'Radio 2', 'Radio 1']
+    response = client.put('/radio/', json=[stationids[0], stationids[0], stationids[1]])
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("data", [{'disk': 1},
+                                  {'album': 1, 'playlist': 2},
+                                  {'album': 1, 'queuepos': 0},
+                                  {'radio': 1, 'track': 2},
+                                  {'url': 'https://example.com/', 'queuepos': 0},
+                                  {'track': 0},
+                                  {'track': '0'},
+                                  {'radio': 0}])
+def test_play_rejects_invalid_selection(client, data):
+    response = client.post('/player/play', json=data)
+    assert response.status_code == 400
+
+
+def test_reorder_queue(client, real_db, test_app):
+    with real_db() as db:
+        trackids = [db.ensure_track_exists(Track(Title=title, Filepath=f'/music/{title}.mp3')).Id
+                    for title in ['Track 1', 'Track 2', 'Track 3']]
+    response = client.put('/queue/', json={'queue': [trackids[2], trackids[0], trackids[1]]})
+    assert response.status_code == 204
+    assert [track.title for track in test_app.current_player.queue] == ['Track 3', 'Track 1', 'Track 2']
+    response = client.put('/queue/', json={'queue': [trackids[0], max(trackids) + 1]})
+    assert response.status_code == 404
+    response = client.put('/queue/', json={'queue': [trackids[0], 'x']})
+    assert response.status_code == 400
+
+
+def test_accepts_gzip_is_parsed_once_per_request(test_app):
+    with test_app.test_request_context(headers={'Accept-Encoding': 'deflate, GZIP'}) as context:
+        assert context.request.accepts_gzip
+        assert 'accepts_gzip' in vars(context.request)
+    with test_app.test_request_context(headers={'Accept-Encoding': 'deflate'}) as context:
+        assert not context.request.accepts_gzip
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [('gzip, deflate', True),
+                                                       ('*', True),
+                                                       ('gzip;q=0, deflate', False),
+                                                       ('x-gzip', False),
+                                                       ('', False)])
+def test_accepts_gzip(test_app, accept_encoding, expected):
+    with test_app.test_request_context(headers={'Accept-Encoding': accept_encoding}) as context:
+        assert context.request.accepts_gzip == expected
+
+
+def test_search_is_case_insensitive(client, real_db):
+    with real_db() as db:
+        album = db.ensure_album_exists(Album(Artist='Bill and Ben', Title='Flowerpot', IsCompilation=False))
+        db.ensure_track_exists(Track(Title='Little Weed', Artist='Bill and Ben', Filepath='/music/weed.mp3',
+                                     Album=album.Id))
+    response = client.get('/search/FLOWERPOT weed Weed')
+    assert response.status_code == 200
+    assert response.json['albums'] == []
+    assert [track['title'] for track in response.json['tracks']] == ['Little Weed']
+    response = client.get('/search/BEN')
+    assert [album['title'] for album in response.json['albums']] == ['Flowerpot']
+    assert [artist['name'] for artist in response.json['artists']] == ['Bill and Ben']
+
+
+def test_get_artist_groups_albums_by_artist(client, real_db):
+    with real_db() as db:
+        for artist, title in [('Bill and Ben', 'Flowerpot'), ('Ben Folds', 'Rockin\' the Suburbs'),
+                              ('Bill and Ben', 'Weed')]:
+            db.ensure_album_exists(Album(Artist=artist, Title=title, IsCompilation=False))
+    response = client.get('/artists/ben?exact=false')
+    assert response.status_code == 200
+    assert {artist: sorted(album['title'] for album in albums) for artist, albums in response.json.items()} == {
+        'Ben Folds': ['Rockin\' the Suburbs'],
+        'Bill and Ben': ['Flowerpot', 'Weed'],
+    }
+
+
+def test_status_does_not_open_database_when_counts_are_cached(client, real_db, test_app):
+    assert client.get('/').json['NumberAlbums'] == 0
+    test_app.current_player.current_volume = 50
+    with patch('pijuv2.backend.nowplaying.DatabaseAccess') as mock_dbaccess:
+        response = client.get('/')
+    assert response.json['PlayerVolume'] == 50
+    assert response.json['NumberAlbums'] == 0
+    mock_dbaccess.assert_not_called()
+
+
+def test_get_queue(client, real_db, test_app):
+    with real_db() as db:
+        trackids = [db.ensure_track_exists(Track(Title=title, Filepath=f'/music/{title}.mp3')).Id
+                    for title in ['Track 1', 'Track 2']]
+    player = test_app.current_player
+    player.queue = [QueuedTrack('/music/Track 2.mp3', trackids[1], None, 'Track 2', None),
+                    QueuedTrack('/downloads/video.m4a', -1, 'Someone', 'Video', 'https://example.com/video.jpg'),
+                    QueuedTrack('/music/Track 1.mp3', trackids[0], None, 'Track 1', None)]
+    player.current_track_index = 0
+    with patch.object(Database, 'get_track_by_id') as mock_get_track_by_id:
+        response = client.get('/queue/')
+    assert response.status_code == 200
+    assert [track['title'] for track in response.json] == ['Track 2', 'Video', 'Track 1']
+    assert [track['link'] for track in response.json] == [f'/tracks/{trackids[1]}',
+                                                          '/tracks/-1',
+                                                          f'/tracks/{trackids[0]}']
+    assert response.json[1]['artwork'] == 'https://example.com/video.jpg'
+    mock_get_track_by_id.assert_not_called()
+
+
+def test_status_reflects_queue_deletion(client, real_db, test_app):
+    with real_db() as db:
+        trackids = [db.ensure_track_exists(Track(Title=title, Filepath=f'/music/{title}.mp3')).Id
+                    for title in ['Track 1', 'Track 2']]
+    player = test_app.current_player
+    player.queue = [QueuedTrack('/music/Track 1.mp3', trackids[0], None, 'Track 1', None),
+                    QueuedTrack('/music/Track 2.mp3', trackids[1], None, 'Track 2', None)]
+    player.current_track_index = 0
+    assert client.get('/').json['MaximumTrackIndex'] == 2
+    response = client.delete('/queue/', json={'index': 1, 'track': trackids[1]})
+    assert response.status_code == 204
+    assert client.get('/').json['MaximumTrackIndex'] == 1
+
+
+def test_playlists_are_cached_until_playlist_change(client, test_app):
+    # Each request must have its own app context (and so database session), as in the real server
+    with test_app.app_context(), DatabaseAccess() as db:
+        for title in ['Track 1', 'Track 2']:
+            db.ensure_track_exists(Track(Title=title, Filepath=f'/music/{title}.mp3'))
+    assert client.get('/playlists/').json == []
+    assert client.get('/tracks/').json[0]['title'] == 'Track 1'
+    response = client.post('/playlists/', json={'title': 'My Playlist', 'tracks': ['/tracks/1']})
+    assert response.status_code == 200
+    playlistid = response.json['playlistid']
+    assert [playlist['title'] for playlist in client.get('/playlists/').json] == ['My Playlist']
+    assert client.get(f'/playlists/{playlistid}').json['tracks'] == ['/tracks/1']
+    response = client.put(f'/playlists/{playlistid}', json={'title': 'Renamed', 'tracks': ['/tracks/2']})
+    assert response.status_code == 200
+    assert [playlist['title'] for playlist in client.get('/playlists/').json] == ['Renamed']
+    assert client.get(f'/playlists/{playlistid}').json['tracks'] == ['/tracks/2']
+
+
+def test_status_is_not_resent_if_unchanged(client, real_db, test_app):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    etag, is_weak = response.get_etag()
+    assert is_weak
+    response = client.get('/', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_etag() == (etag, True)
+    test_app.current_player.current_volume = 50
+    response = client.get('/', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 200
+    assert response.json['PlayerVolume'] == 50
+
+
+def test_radio_stations_are_cached_until_station_change(client, test_app):
+    response = client.post('/radio/', json={'name': 'Radio 1', 'url': 'https://example.com/radio1'})
+    assert response.status_code == 200
+    stationid = response.json['id']
+    assert [station['name'] for station in client.get('/radio/').json] == ['Radio 1']
+    response = client.put(f'/radio/{stationid}', json={'name': 'Radio 2', 'url': 'https://example.com/radio2'})
+    assert response.status_code == 200
+    assert [station['name'] for station in client.get('/radio/').json] == ['Radio 2']
+    assert client.get(f'/radio/{stationid}').json['name'] == 'Radio 2'
+    response = client.delete(f'/radio/{stationid}')
+    assert response.status_code == 204
+    assert client.get('/radio/').json == []
+
+
+def test_status_message_is_serialized_once_per_status(real_db, test_app):
+    message = get_current_status_message()
+    assert json.loads(message)['PlayerVolume'] == 100
+    assert get_current_status_message() is message
+    test_app.current_player.current_volume = 50
+    assert json.loads(get_current_status_message())['PlayerVolume'] == 50
+
+
+def test_search_matches_non_ascii_words(client, real_db):
+    with real_db() as db:
+        album = db.ensure_album_exists(Album(Artist='Édith Piaf', Title='Édith Piaf', IsCompilation=False))
+        db.ensure_track_exists(Track(Title='Édith Piaf', Artist='Édith Piaf', Filepath='/music/edith.mp3',
+                                     Album=album.Id))
+    response = client.get('/search/Édith Édith')
+    assert [album['title'] for album in response.json['albums']] == ['Édith Piaf']
+    assert [artist['name'] for artist in response.json['artists']] == ['Édith Piaf']
+    assert [track['title'] for track in response.json['tracks']] == ['Édith Piaf']
+
+
+def test_library_cache_ignores_unused_query_arguments(client, real_db, test_app):
+    assert client.get('/radio/?_=1').json == []
+    assert client.get('/radio/?_=2').json == []
+    assert client.get('/playlists/?_=1').json == []
+    assert len(test_app.library_cache) == 2
+
+
+def test_cached_response_is_not_resent_if_unchanged(client, real_db):
+    with real_db() as db:
+        album = db.ensure_album_exists(Album(Artist='Bill and Ben', Title='Flowerpot', IsCompilation=False))
+    response = client.get(f'/albums/{album.Id}')
+    assert response.status_code == 200
+    etag, is_weak = response.get_etag()
+    assert is_weak
+    # The second request is served from the library cache
+    response = client.get(f'/albums/{album.Id}', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_etag() == (etag, True)
+    response = client.get(f'/albums/{album.Id}', headers={'If-None-Match': 'W/"other"'})
+    assert response.status_code == 200
+    assert response.json['title'] == 'Flowerpot'
+
+
+def test_add_playlist_from_files_does_not_collapse_parent_components(client, real_db, test_app):
+    music_dir = test_app.piju_config.music_dir
+    with real_db() as db:
+        db.ensure_track_exists(Track(Title='Track 1', Filepath=str(music_dir / 'Track 1.mp3')))
+    response = client.post('/playlists/', json={'title': 'My Playlist',
+                                                'files': ['./Track 1.mp3', 'subdir/../Track 1.mp3']})
+    assert response.status_code == 200
+    assert response.json['nrtracks'] == 1
+    assert response.json['missing'] == ['subdir/../Track 1.mp3']
@@ -0,0 +1,63 @@
+from queue import SimpleQueue
+from unittest.mock import MagicMock
+
+from flask_sock import ConnectionClosed
+
+from pijuv2.backend.broadcastthread import BroadcastThread
+
+
+def test_only_latest_status_is_sent():
+    app = MagicMock()
+    ws = MagicMock()
+    app.websocket_clients = {ws}
+    broadcast_queue = SimpleQueue()
+    broadcast_queue.put('status 1')
+    broadcast_queue.put('status 2')
+
+    BroadcastThread(app, broadcast_queue).send_latest()
+
+    ws.send.assert_called_once_with('status 2')
+
+
+def test_closed_clients_are_removed():
+    app = MagicMock()
+    closed_ws = MagicMock()
+    closed_ws.send.side_effect = ConnectionClosed(None, None)
+    open_ws = MagicMock()
+    app.websocket_clients = {closed_ws, open_ws}
+    broadcast_queue = SimpleQueue()
+    broadcast_queue.put('status')
+
+    BroadcastThread(app, broadcast_queue).send_latest()
+
+    assert app.websocket_clients == {open_ws}
+    open_ws.send.assert_called_once_with('status')
+
+
+def test_unchanged_status_is_not_resent():
+    app = MagicMock()
+    ws = MagicMock()
+    app.websocket_clients = {ws}
+    broadcast_queue = SimpleQueue()
+    thread = BroadcastThread(app, broadcast_queue)
+
+    for status in ['status 1', 'status 1', 'status 2']:
+        broadcast_queue.put(status)
+        thread.send_latest()
+
+    assert [call.args[0] for call in ws.send.call_args_list] == ['status 1', 'status 2']
+
+
+def test_failed_clients_are_removed():
+    app = MagicMock()
+    reset_ws = MagicMock()
+    reset_ws.send.side_effect = BrokenPipeError()
+    open_ws = MagicMock()
+    app.websocket_clients = {reset_ws, open_ws}
+    broadcast_queue = SimpleQueue()
+    broadcast_queue.put('status')
+
+    BroadcastThread(app, broadcast_queue).send_latest()
+
+    assert app.websocket_clients == {open_ws}
+    open_ws.send.assert_called_once_with('status')
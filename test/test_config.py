@@ -0,0 +1,27 @@
+from pijuv2.backend.config import Config
+
+
+def test_config_from_json(tmp_path):
+    config_file = tmp_path / 'pijudrc'
+    config_file.write_text(f'{{"music_dir": "{tmp_path}", "download_dir": "{tmp_path}", "server_name": "piju"}}')
+
+    config = Config(config_file)
+
+    assert config.music_dir == tmp_path
+    assert config.server_name == 'piju'
+    assert config.compression_level == Config.Defaults.COMPRESSION_LEVEL
+
+
+def test_config_from_json5(tmp_path):
+    config_file = tmp_path / 'pijudrc'
+    config_file.write_text('{\n'
+                           '  // JSON5 allows comments, unquoted keys and trailing commas\n'
+                           f'  music_dir: "{tmp_path}",\n'
+                           f'  download_dir: "{tmp_path}",\n'
+                           '  compression_level: 6,\n'
+                           '}\n')
+
+    config = Config(config_file)
+
+    assert config.music_dir == tmp_path
+    assert config.compression_level == 6
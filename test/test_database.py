@@ -1,11 +1,12 @@
 # pylint: disable=redefined-outer-name,unnecessary-dunder-call,unused-argument
 
 from flask import Flask
+from sqlalchemy import inspect
 
 import pytest
 
 from pijuv2.scan.directory import set_cross_refs
-from pijuv2.database.database import Database
+from pijuv2.database.database import Database, NotFoundException
 from pijuv2.database.schema import Album, Artwork, Track
 
 TEST_DB = 'test.db'
@@ -85,6 +86,16 @@ def test_get_all_albums(db_in_app_context):
     assert album.IsCompilation == albumref.IsCompilation
 
 
+def test_get_nr_albums_artworks_tracks(db_in_app_context):
+    assert db_in_app_context.get_nr_albums_artworks_tracks() == (0, 0, 0)
+
+    db_in_app_context.ensure_album_exists(mk_other_albumref())
+    db_in_app_context.ensure_track_exists(Track(Title="Track 1"))
+    db_in_app_context.ensure_track_exists(Track(Title="Track 2"))
+
+    assert db_in_app_context.get_nr_albums_artworks_tracks() == (1, 0, 2)
+
+
 def test_get_all_tracks(db_in_app_context):
     assert db_in_app_context.get_all_tracks() == []
 
@@ -115,6 +126,63 @@ def test_get_album_by_id(db_in_app_context):
     assert found.Artist == album1.Artist
 
 
+def test_get_tracks_by_ids(db_in_app_context):
+    track1 = db_in_app_context.ensure_track_exists(Track(Title="Track 1"))
+    track2 = db_in_app_context.ensure_track_exists(Track(Title="Track 2"))
+
+    found = db_in_app_context.get_tracks_by_ids([track2.Id, track1.Id, track2.Id])
+
+    assert [track.Title for track in found] == ["Track 2", "Track 1", "Track 2"]
+
+
+def test_get_tracks_by_ids_unknown_id(db_in_app_context):
+    track1 = db_in_app_context.ensure_track_exists(Track(Title="Track 1"))
+
+    with pytest.raises(NotFoundException):
+        db_in_app_context.get_tracks_by_ids([track1.Id, track1.Id + 1])
+
+
+def test_get_tracks_by_filepaths(db_in_app_context):
+    track1 = db_in_app_context.ensure_track_exists(Track(Title="Track 1", Filepath="/music/Track 1.mp3"))
+    track2 = db_in_app_context.ensure_track_exists(Track(Title="Track 2", Filepath="/music/Track 2.mp3"))
+
+    found = db_in_app_context.get_tracks_by_filepaths(["/music/track 2.MP3",
+                                                       "/music/Track 3.mp3",
+                                                       "/music/Track 1.mp3"])
+
+    assert found == {"/music/track 2.MP3": track2, "/music/Track 1.mp3": track1}
+
+
+def test_get_genres_by_ids(db_in_app_context):
+    rock = db_in_app_context.ensure_genre_exists("Rock")
+    jazz = db_in_app_context.ensure_genre_exists("Jazz")
+    db_in_app_context.ensure_genre_exists("Pop")
+
+    found = db_in_app_context.get_genres_by_ids([jazz.Id, rock.Id, jazz.Id])
+
+    assert sorted(genre.Name for genre in found) == ["Jazz", "Rock"]
+
+
+def test_search_for_artists(db_in_app_context):
+    for artist, title in [("Bill and Ben", "Flowerpot"), ("Bill and Ben", "Weed"), ("Ben Folds", "Rockin"),
+                          ("Benny Hill", "Saucy"), (None, "Untitled")]:
+        db_in_app_context.ensure_album_exists(Album(Artist=artist, Title=title, IsCompilation=False))
+
+    assert db_in_app_context.search_for_artists(["ben"]) == ["Ben Folds", "Benny Hill", "Bill and Ben"]
+    assert db_in_app_context.search_for_artists(["ben", "bill"]) == ["Bill and Ben"]
+
+
+def test_album_tracks_are_in_album_order(db_in_app_context):
+    album = db_in_app_context.ensure_album_exists(mk_other_albumref())
+    for disk, track_nr in [(2, 1), (1, 2), (None, None), (1, 1)]:
+        db_in_app_context.ensure_track_exists(Track(Title=f"Track {disk}-{track_nr}", Album=album.Id,
+                                                    VolumeNumber=disk, TrackNumber=track_nr))
+
+    found = db_in_app_context.get_album_by_id(album.Id)
+
+    assert [track.Title for track in found.Tracks] == ["Track None-None", "Track 1-1", "Track 1-2", "Track 2-1"]
+
+
 def test_get_genre_by_id(db_in_app_context):
     # Prepare
     genre_name = "Technocrat Jazz"
@@ -207,3 +275,39 @@ def test_delete_track_deletes_artwork(db_in_app_context):
     # Check
     assert len(db_in_app_context.get_all_artworks()) == 0
     assert len(db_in_app_context.get_all_tracks()) == 0
+
+
+def test_artwork_blob_is_loaded_on_demand(db_in_app_context):
+    artwork = db_in_app_context.ensure_artwork_exists(Artwork(Blob=b'\x89PNG', Width=1, Height=1))
+    Database.db.session.expire_all()
+
+    found = db_in_app_context.get_artwork_by_id(artwork.Id)
+
+    assert 'Blob' in inspect(found).unloaded
+    assert found.Blob == b'\x89PNG'
+
+
+def test_album_artwork_is_from_first_track_with_artwork(db_in_app_context):
+    album = db_in_app_context.ensure_album_exists(mk_other_albumref())
+    artwork1 = db_in_app_context.ensure_artwork_exists(Artwork(Path="/cover1.jpg", Width=1, Height=1))
+    artwork2 = db_in_app_context.ensure_artwork_exists(Artwork(Path="/cover2.jpg", Width=1, Height=1))
+    for track_nr, artwork in [(3, artwork1), (1, None), (2, artwork2)]:
+        db_in_app_context.ensure_track_exists(Track(Title=f"Track {track_nr}", Album=album.Id, TrackNumber=track_nr,
+                                                    Artwork=artwork.Id if artwork else None))
+    Database.db.session.expire_all()
+
+    found = db_in_app_context.get_album_by_id(album.Id)
+
+    assert found.Artwork == artwork2.Id
+
+
+def test_get_album_by_id_track_ids_only(db_in_app_context):
+    album = db_in_app_context.ensure_album_exists(mk_other_albumref())
+    for track_nr in [2, 1]:
+        db_in_app_context.ensure_track_exists(Track(Title=f"Track {track_nr}", Album=album.Id, TrackNumber=track_nr))
+    Database.db.session.expire_all()
+
+    found = db_in_app_context.get_album_by_id(album.Id, track_ids_only=True)
+
+    assert all('Title' in inspect(track).unloaded for track in found.Tracks)
+    assert [track.Title for track in found.Tracks] == ["Track 1", "Track 2"]
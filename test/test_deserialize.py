@@ -2,7 +2,7 @@ import pytest
 from pijuv2.backend.deserialize import extract_id, extract_ids, parse_bool
 
 
-@pytest.mark.parametrize('testval', ['', '/albums/12X', 'cat'])
+@pytest.mark.parametrize('testval', ['', '/albums/12X', 'cat', '/albums/', '-5', '12\n', '\u00b2', None, ['12']])
 def test_extract_id_illegal_values_return_none(testval):
     assert extract_id(testval) is None
 
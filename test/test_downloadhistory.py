@@ -37,3 +37,12 @@ def test_history_repeat_add_moves_to_front():
     assert history.entries == ['url3', 'url2', 'url1']
     history.add('url1')
     assert history.entries == ['url1', 'url3', 'url2']
+
+
+def test_history_forgets_info_for_dropped_entries():
+    history = DownloadHistory(max_length=1)
+    history.add('url1')
+    history.set_info('url1', ['file1'])
+    history.add('url2')
+    assert history.entries == ['url2']
+    assert history.get_info('url1') is None
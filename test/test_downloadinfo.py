@@ -1,5 +1,3 @@
-from pathlib import Path
-
 from pijuv2.backend.downloadinfo import DownloadInfoDatabaseSingleton
 
 
@@ -16,9 +14,9 @@ def test_get_values_are_distinct():
     assert val1 != val2
 
 
-def test_get_path_and_str_are_equivalent():
+def test_get_same_path_gives_same_value():
     db = DownloadInfoDatabaseSingleton()
-    val1 = db.get_id_for_filepath(Path('/over/there'))
+    val1 = db.get_id_for_filepath('/over/there')
     val2 = db.get_id_for_filepath('/over/there')
     assert val1 == val2
 
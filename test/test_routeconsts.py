@@ -0,0 +1,47 @@
+# pylint: disable=redefined-outer-name
+from flask import Flask
+
+import pytest
+
+from pijuv2.backend.routeconsts import RouteConstants, url_for, url_for_ids
+
+
+@pytest.fixture
+def test_app():
+    app = Flask(__name__)
+    app.server_address = 'http://piju:5000'
+    yield app
+
+
+def test_url_for_in_request_context_is_relative(test_app):
+    with test_app.test_request_context():
+        assert url_for(RouteConstants.GET_ALBUM, albumid=123) == '/albums/123'
+        assert url_for(RouteConstants.GET_TRACK, trackid='45') == '/tracks/45'
+
+
+def test_url_for_outside_request_context_is_absolute(test_app):
+    with test_app.app_context():
+        assert url_for(RouteConstants.GET_ARTWORK, artworkid=6) == 'http://piju:5000/artwork/6'
+
+
+def test_url_for_quotes_path_values(test_app):
+    with test_app.test_request_context():
+        assert url_for(RouteConstants.GET_ARTIST, artist='AC/DC') == '/artists/AC/DC'
+        assert url_for(RouteConstants.GET_ARTIST, artist='Simon & Garfunkel') == '/artists/Simon%20%26%20Garfunkel'
+
+
+def test_url_for_ids_matches_url_for(test_app):
+    with test_app.test_request_context():
+        assert url_for_ids(RouteConstants.GET_ALBUM, [1, 23]) == [url_for(RouteConstants.GET_ALBUM, albumid=1),
+                                                                  url_for(RouteConstants.GET_ALBUM, albumid=23)]
+    with test_app.app_context():
+        assert url_for_ids(RouteConstants.GET_TRACK, [4]) == ['http://piju:5000/tracks/4']
+        assert url_for_ids(RouteConstants.GET_TRACK, []) == []
+
+
+def test_url_for_integer_id_matches_expanded_route(test_app):
+    with test_app.test_request_context():
+        assert url_for(RouteConstants.GET_TRACK, trackid=-1) == '/tracks/-1'
+        assert url_for(RouteConstants.GET_TRACK, trackid=-1) == url_for(RouteConstants.GET_TRACK, trackid='-1')
+    with test_app.app_context():
+        assert url_for(RouteConstants.GET_ONE_RADIO_STATION, stationid=7) == 'http://piju:5000/radio/7'
@@ -1,8 +1,10 @@
+from unittest.mock import MagicMock, patch
+
 from flask import Flask
 
 from pijuv2.database.database import Database, DatabaseAccess
 from pijuv2.database.schema import Album, Track
-from pijuv2.scan.directory import set_cross_refs
+from pijuv2.scan.directory import scan_directory, set_cross_refs
 
 TEST_DB = 'test.db'
 
@@ -55,3 +57,20 @@ def test_change_track_genre(tmp_path):
             assert len(genre1.Albums) == 0
             genre2 = db.get_genre_by_id(genre2id)
             assert len(genre2.Albums) == 1
+
+
+def test_scan_directory_reports_each_saved_track(tmp_path):
+    test_app = Flask(__name__)
+    for title in ['Track 1', 'Track 2']:
+        (tmp_path / f'{title}.mp3').touch()
+    with test_app.app_context():
+        Database.init_db(test_app, path=tmp_path / TEST_DB, create=True)
+        callback = MagicMock()
+        with patch('pijuv2.scan.directory.scan_mp3') as mock_scan_mp3:
+            mock_scan_mp3.side_effect = lambda path: (Track(Title=path.stem, Filepath=str(path)),
+                                                      Album(Title="Album"),
+                                                      None)
+            with DatabaseAccess() as db:
+                scan_directory(tmp_path, db, track_saved_callback=callback)
+                assert db.get_nr_tracks() == 2
+        assert callback.call_count == 2
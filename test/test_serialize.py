@@ -0,0 +1,17 @@
+import pytest
+
+from pijuv2.backend.serialize import InformationLevel
+
+
+@pytest.mark.parametrize("info, expected", [('none', InformationLevel.NoInfo),
+                                            ('Links', InformationLevel.Links),
+                                            ('ALL', InformationLevel.AllInfo),
+                                            ('debug', InformationLevel.DebugInfo),
+                                            ('', InformationLevel.AllInfo),
+                                            ('allinfo', InformationLevel.AllInfo)])
+def test_information_level_from_string(info, expected):
+    assert InformationLevel.from_string(info, InformationLevel.AllInfo) == expected
+
+
+def test_information_level_from_string_default():
+    assert InformationLevel.from_string('unknown') == InformationLevel.Links